@@ -1,10 +1,11 @@
-from .filemethods import state, config, tokens
+from .filemethods import state, config, tokens, jobs
 from . import soundcloud, utils, datatypes, validator
 
 __all__ = [
     "state",
     "config",
     "tokens",
+    "jobs",
     "soundcloud",
     "utils",
     "datatypes",
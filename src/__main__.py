@@ -3,15 +3,21 @@ from disnake.ext import commands
 
 import json
 import asyncio
+import os
+import traceback
 
-from inspect import signature
-
-from .datatypes import Tokens, Config, State
-from . import validator, soundcloud, cogs
+from .datatypes import Tokens, Config, State, Jobs, UpdateHistory
+from . import validator, soundcloud, cogs, utils, replay
 
 CONFIG_FILENAME = "config.json"
 STATE_FILENAME = "state.json"
 TOKENS_FILENAME = "tokens.json"
+JOBS_FILENAME = "jobs.json"
+AUDIO_CACHE_FOLDER = "cache/audio"
+HISTORY_FOLDER = "history"
+
+# set this to a path to record gateway events there (see src/replay)
+TRACE_ENV = "WUCKBOT_TRACE"
 
 def main():
     loop = asyncio.new_event_loop()
@@ -22,6 +28,12 @@ def main():
         config = json.load(fp)
     guild = config["guild"]
 
+    # the readiness gate only holds onto events from our own categories
+    categories = config.get("categories", {})
+    bot_categories = [
+        categories.get(key, Config.Categories._TD_FIELDS[key].default.name)
+        for key in ("wip", "sketch")]
+
     with open(TOKENS_FILENAME, "r") as fp:
         tokens = json.load(fp)
     discord_token = tokens["discord"]
@@ -33,15 +45,33 @@ def main():
     intents.members = True
     intents.message_content = True
 
+    trace_path = os.environ.get(TRACE_ENV)
+
     bot = commands.InteractionBot(
         intents=intents,
         test_guilds=[guild],
+        enable_debug_events=bool(trace_path),
         loop=loop)
 
     on_close = []
-    async def _on_ready():
-        sc = await soundcloud.Client.create(soundcloud_token)
-        on_close.append(sc.close())
+    if trace_path:
+        recorder = replay.Recorder(bot, trace_path)
+        on_close.append(recorder.close())
+
+    # holds onto messages, reactions, etc. until state is loaded
+    gate = utils.ReadinessGate(bot, bot_categories)
+
+    # every cog's on_message and on_button_click handling goes through here.
+    # the router needs state() to classify anything, so it only starts
+    # listening once the gate opens
+    router = utils.MessageRouter()
+
+    components = utils.ComponentRouter()
+
+    sc_task: asyncio.Task[soundcloud.Client] | None = None
+
+    async def _setup():
+        sc = await sc_task
 
         registrar = validator.Registrar(
             *validator.base_serializers(),
@@ -49,38 +79,76 @@ def main():
             *soundcloud.serializers(sc)
         )
 
-        # load json
-        await State.load(STATE_FILENAME, "backups/state", registrar)
-        on_close.append(State().save())
+        # load json. none of these depend on each other
+        await asyncio.gather(
+            State.load(STATE_FILENAME, "backups/state", registrar),
+            Config.load(CONFIG_FILENAME, "backups/config", registrar),
+            Tokens.load(TOKENS_FILENAME, "backups/tokens", registrar),
+            Jobs.load(JOBS_FILENAME, "backups/jobs", registrar))
+
+        audio = utils.AudioCache(
+            AUDIO_CACHE_FOLDER, sc.http,
+            Config().audio_cache_megabytes * 1000 * 1000)
+
+        history = UpdateHistory(HISTORY_FOLDER, registrar)
 
-        await Config.load(CONFIG_FILENAME, "backups/config", registrar)
-        on_close.append(Config().save())
+        cogs.add_cogs(bot, sc=sc, router=router, components=components,
+                      audio=audio, history=history)
 
-        await Tokens.load(TOKENS_FILENAME, "backups/tokens", registrar)
-        on_close.append(Tokens().save())
+        on_close.extend((State().save(), Config().save(), Tokens().save(),
+                         Jobs().save()))
 
-        for cog_name in cogs.__all__:
-            Cog = getattr(cogs, cog_name)
-            print(f"Initializing {cog_name}...")
+    setting_up = False
 
-            all_kwargs = {"bot": bot, "sc": sc}
+    async def _on_ready():
+        nonlocal sc_task, setting_up
 
-            params = signature(Cog.__init__).parameters.keys()
-            kwargs = {k: v for (k, v) in all_kwargs.items() if k in params}
+        # on_ready fires again on reconnects, and could even do so while
+        # we're still in here
+        if setting_up:
+            return
+        setting_up = True
 
-            bot.add_cog(Cog(**kwargs))
+        try:
+            await _setup()
+        except Exception as e:
+            # stay subscribed and keep the gate shut, so the next on_ready
+            # (after a reconnect) gets another go at it
+            print("Setup failed, will retry on the next on_ready:")
+            traceback.print_exception(e)
+            if sc_task.done() and not sc_task.cancelled() \
+                    and sc_task.exception():
+                sc_task = asyncio.create_task(
+                    soundcloud.Client.create(soundcloud_token))
+            return
+        finally:
+            setting_up = False
 
-        # we don't want to run this multiple times
         bot.remove_listener(_on_ready, "on_ready")
+        # buttons aren't worth holding onto (the interaction is long gone by
+        # the time we'd get to it), but they shouldn't hit an empty router
+        bot.add_listener(router.on_message, "on_message")
+        bot.add_listener(components.on_button_click, "on_button_click")
+        gate.open()
 
     bot.add_listener(_on_ready, "on_ready")
 
     async def runner() -> None:
+        nonlocal sc_task
+
+        # the soundcloud client doesn't need discord at all, so get it going
+        # while we connect
+        sc_task = asyncio.create_task(
+            soundcloud.Client.create(soundcloud_token))
         try:
             await bot.start(token=discord_token)
         finally:
             if not bot.is_closed():
                 await bot.close()
+            if not sc_task.done():
+                sc_task.cancel()
+            elif not sc_task.cancelled() and not sc_task.exception():
+                on_close.append(sc_task.result().close())
             await asyncio.gather(*on_close)
 
     def _shutdown_loop():
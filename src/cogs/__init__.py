@@ -7,6 +7,9 @@ from .sketch import SketchCog
 from .archive import ArchiveCog
 from .oauth import OauthCog
 
+from disnake.ext import commands
+from inspect import signature
+
 __all__ = [
     'WipCog',
     'WipsCog',
@@ -17,3 +20,20 @@ __all__ = [
     'ArchiveCog',
     'OauthCog'
 ]
+
+# every cog gets whichever of the dependencies its __init__ asks for
+def add_cogs(bot: commands.InteractionBot, **dependencies):
+    dependencies["bot"] = bot
+
+    for cog_name in __all__:
+        # already there from an earlier attempt that failed partway
+        if bot.get_cog(cog_name):
+            continue
+
+        Cog = globals()[cog_name]
+        print(f"Initializing {cog_name}...")
+
+        params = signature(Cog.__init__).parameters.keys()
+        kwargs = {k: v for (k, v) in dependencies.items() if k in params}
+
+        bot.add_cog(Cog(**kwargs))
@@ -4,17 +4,25 @@ from datetime import datetime, timedelta
 import calendar
 
 import asyncio
-from ..utils import embeds, error_handler, UserError, get_audio_attachment
+from ..utils import embeds, error_handler, UserError, get_audio_attachment, \
+    ledger, AudioCache, ProgressReporter
 from ..filemethods import state, config
 from ..datatypes import Wip, Sketch
 from .. import soundcloud
 
 class ArchiveCog(commands.Cog):
-    def __init__(self, bot: commands.InteractionBot, sc: soundcloud.Client):
+    def __init__(self,
+                 bot: commands.InteractionBot,
+                 sc: soundcloud.Client,
+                 audio: AudioCache):
         self.bot = bot
+        self.audio = audio
         self.last_loop: datetime = disnake.utils.utcnow()
         self.loop.start()
 
+    def cog_unload(self):
+        self.loop.cancel()
+
     @staticmethod
     def add_time(dt: datetime, months: int = 0, days: int = 0) -> datetime:
         for _ in range(months):
@@ -77,18 +85,34 @@ class ArchiveCog(commands.Cog):
                     embed=embed
                 )
 
-    # archive wip after 6 months
+    # archive wip after 6 months. they all come out of state in one save
+    # up front, and the discord/soundcloud work happens after that, outside
+    # of the transaction
     async def archive_wips(self, time):
+        expired = []
         for wip in state().wips:
             timestamp = wip.update.timestamp if wip.update else wip.timestamp
             if self.add_time(timestamp, months=6) <= time:
-                await self.archive_wip(wip)
+                expired.append(wip)
+
+        async with state().transaction():
+            for wip in expired:
+                await state().remove_wip(wip)
+
+        for wip in expired:
+            await self.archive_wip(wip)
 
     # archive sketch after 3 days
     async def archive_sketches(self, time):
-        for sketch in state().sketches:
-            if self.add_time(sketch.timestamp, days=3) <= time:
-                await self.archive_sketch(sketch)
+        expired = [sketch for sketch in state().sketches
+                   if self.add_time(sketch.timestamp, days=3) <= time]
+
+        async with state().transaction():
+            for sketch in expired:
+                await state().remove_sketch(sketch)
+
+        for sketch in expired:
+            await self.archive_sketch(sketch)
 
     @tasks.loop(hours=1.0)
     async def loop(self):
@@ -102,19 +126,25 @@ class ArchiveCog(commands.Cog):
     async def before_loop(self):
         await self.bot.wait_until_ready()
 
-    async def archive_wip(self, wip: Wip):
+    async def archive_wip(self, wip: Wip,
+                          progress: ProgressReporter | None = None):
+        def report(status: str):
+            if progress:
+                progress.update(status)
+
         archive_category = await config().categories.archive.get(wip.guild)
         view_archive = await config().roles.view_archive.get(wip.guild)
         bandmate_role = await config().roles.band_member.get(wip.guild)
 
         # remove wip from state
-        state().wips = [w for w in state().wips if w.channel != wip.channel]
+        await state().remove_wip(wip)
 
         # if soundcloud track, move it to the archive playlist
 
         # TODO: ByName for soundcloud stuff, too
         track = wip.track
         if track:
+            report("Moving the track to the archive playlist...")
             archive_playlist = None
             wips_playlist = None
             async for pl in track.sc.me.playlists():
@@ -139,10 +169,13 @@ class ArchiveCog(commands.Cog):
             await archive_playlist.add_track(track, top=True)
 
         # remove the wip role
+        report("Removing the WIP role...")
+        ledger.expect(disnake.AuditLogAction.role_delete, wip.role.id)
         await wip.role.delete(reason="wip archival")
 
         # change permissions so only people with "view archives" role can access
         # move the channel to the archive category
+        report("Moving the channel...")
         await wip.channel.edit(
             category=archive_category,
             overwrites={
@@ -161,8 +194,7 @@ class ArchiveCog(commands.Cog):
 
     async def archive_sketch(self, sketch: Sketch):
         # remove sketch from state
-        state().sketches = [
-            s for s in state().sketches if s.channel != sketch.channel]
+        await state().remove_sketch(sketch)
 
         guild = sketch.channel.guild
 
@@ -194,7 +226,7 @@ class ArchiveCog(commands.Cog):
                     auto_archive_duration=10080,
                     reason="sketch archival")
             await thread.send(content=message.author.mention,
-                              file=await attachment.to_file())
+                              file=await self.audio.to_file(attachment))
 
         if thread_message:
             embed.add_field(
@@ -202,6 +234,8 @@ class ArchiveCog(commands.Cog):
                 value="\n".join(c.mention for c in contributors))
             await thread_message.edit(embed=embed)
 
+        ledger.expect(
+            disnake.AuditLogAction.channel_delete, sketch.channel.id)
         await sketch.channel.delete(reason="sketch archival")
 
     @commands.slash_command(
@@ -214,15 +248,27 @@ class ArchiveCog(commands.Cog):
         """
         await inter.response.defer(ephemeral=True)
 
-        if (wip := disnake.utils.get(state().wips, channel=inter.channel)):
-            await self.archive_wip(wip)
+        if (wip := state().wip(inter.channel.id)):
+            status = disnake.Embed(color=disnake.Color.blue(),
+                                   title="Archiving...")
+
+            async def edit_status(msg: str):
+                status.description = msg
+                await inter.edit_original_response(embed=status)
+
+            progress = ProgressReporter(edit_status, config().status_interval)
+            try:
+                await self.archive_wip(wip, progress)
+            finally:
+                await progress.close()
+
             await inter.edit_original_response(
                 embed=embeds.success(
                     "This WIP has been archived, "
                     f"as requested by {inter.author.mention}."))
             return
 
-        if (sketch := disnake.utils.get(state().sketches, channel=inter.channel)):
+        if (sketch := state().sketch(inter.channel.id)):
             await self.archive_sketch(sketch)
             # channel gets deleted, so there's no way to really respond...
             return
@@ -1,55 +1,57 @@
 import disnake
+import asyncio
 import aiohttp
 
-from disnake.ext import commands
+from disnake.ext import commands, tasks
 from datetime import datetime
 
-from ..utils import error_handler, UserError, embeds, buttons, get_blame
-from ..datatypes import Sketch
+from ..utils import UserError, embeds, buttons, get_blame, Blamed, \
+    membership, audit_log, ledger, ComponentRouter, optional_str
+from ..utils.pages import pages, SORTS
+from ..datatypes import Sketch, Wip
+from ..validator import GuildElementByName
 from .. import soundcloud, state
 
 class EventCog(commands.Cog):
-    def __init__(self, bot: commands.InteractionBot, sc: soundcloud.Client):
+    def __init__(self,
+                 bot: commands.InteractionBot,
+                 sc: soundcloud.Client,
+                 components: ComponentRouter):
         self.bot = bot
         self.sc = sc
 
-    @commands.Cog.listener("on_button_click")
-    @error_handler()
-    async def on_button_click(self, inter: disnake.MessageInteraction):
-        name, *args = inter.component.custom_id.split("|")
+        # channel ids of wips that something has drifted on, and whoever
+        # the audit log says did it. they get fixed up together on the next
+        # reconcile pass, however many events came in
+        self.dirty: dict[int, Blamed] = {}
+        self.reconcile.start()
 
-        if name == "wipjoin":
-            channel_id, = args
-            return await self.handle_wip_join(inter, int(channel_id))
+        components.register("wipjoin", self.handle_wip_join, int)
+        components.register("wiptoggle", self.handle_wip_toggle, int)
+        components.register("wipview", self.handle_wip_view,
+                            str, int, int, str,
+                            legacy=self.handle_old_wip_view)
+        components.register("trackdelete", self.handle_track_delete,
+                            int, optional_str)
+        components.register("sketchnew", self.handle_new_sketch)
 
-        if name == "wiptoggle":
-            channel_id, = args
-            return await self.handle_wip_toggle(inter, int(channel_id))
-
-        if name == "wipview":
-            index, = args
-            return await self.handle_wip_view(inter, int(index))
-
-        if name == "trackdelete":
-            s_id, token = args
-            return await self.handle_track_delete(inter, int(s_id), token)
-
-        if name == "sketchnew":
-            return await self.handle_new_sketch(inter)
+    def cog_unload(self):
+        self.reconcile.cancel()
 
     async def handle_wip_join(self,
                               inter: disnake.MessageInteraction,
                               channel_id: int):
 
-        wip = disnake.utils.get(state().wips, channel__id=channel_id)
+        wip = state().wip(channel_id)
         if not wip:
             raise UserError("This WIP no longer exists.")
 
-        if wip.role in inter.author.roles:
+        if membership.in_wip(inter.author, wip.role):
             raise UserError(
                 f"You already have access to {wip.channel.mention}")
 
         await inter.author.add_roles(wip.role)
+        membership.add(inter.author, wip.role)
 
         await inter.response.send_message(
             ephemeral=True,
@@ -62,16 +64,18 @@ class EventCog(commands.Cog):
                                 inter: disnake.MessageInteraction,
                                 id_: int):
 
-        wip = disnake.utils.get(state().wips, channel__id=id_)
+        wip = state().wip(id_)
         if not wip:
             raise UserError("This WIP has been deleted.")
 
         # add to WIP
-        if wip.role in inter.author.roles:
+        if membership.in_wip(inter.author, wip.role):
             await inter.author.remove_roles(wip.role)
+            membership.discard(inter.author, wip.role)
             followup = f"You have been removed from `{wip.name}`."
         else:
             await inter.author.add_roles(wip.role)
+            membership.add(inter.author, wip.role)
             followup = f"You have been added to {wip.channel.mention}."
 
         # update components
@@ -95,31 +99,38 @@ class EventCog(commands.Cog):
 
     async def handle_wip_view(self,
                               inter: disnake.MessageInteraction,
-                              index: int):
-        # keep index within bounds
-        num_wips = len(state().wips)
-        if index < 0:
-            index = 0
-        if index >= num_wips:
-            index = num_wips - 1
+                              sort: str, key: int, channel_id: int,
+                              direction: str):
+        if sort not in SORTS:
+            raise UserError(f"Unknown sort `{sort}`. "
+                            "Try running `/wip view` again.")
+
+        cursor = (key, channel_id)
+        if direction == "next":
+            wip = pages.next(sort, cursor) or pages.last(sort)
+        else:
+            wip = pages.prev(sort, cursor) or pages.first(sort)
 
-        wip = state().wips[index]
+        if not wip:
+            raise UserError("There are no WIPs to view.")
 
-        components = [
-            buttons.wip_view_prev(index - 1),
-            buttons.wip_toggle(wip, inter.author),
-            buttons.wip_view_next(index + 1)
-        ]
+        await inter.response.edit_message(
+            **pages.render(sort, wip, inter.author))
 
-        embed = wip.view_embed()
+    # old view buttons were "wipview|<index>" into a list that's gone now,
+    # so just start them over from the front
+    async def handle_old_wip_view(self,
+                                  inter: disnake.MessageInteraction,
+                                  *_: str):
+        if not (wip := pages.first("newest")):
+            raise UserError("There are no WIPs to view.")
 
         await inter.response.edit_message(
-            embed=embed,
-            components=components)
+            **pages.render("newest", wip, inter.author))
 
     async def handle_track_delete(self,
                                   inter: disnake.MessageInteraction,
-                                  s_id: int, token: str):
+                                  s_id: int, token: str | None):
         try:
             track = await self.sc.fetch_track(s_id, token)
         except aiohttp.ClientResponseError as e:
@@ -195,26 +206,61 @@ class EventCog(commands.Cog):
             topic="/wipify")
         await channel.move(end=True)
 
-        state().sketches.append(await Sketch.create(channel=channel))
+        await state().add_sketch(await Sketch.create(channel=channel))
 
         await inter.response.send_message(
             ephemeral=True,
             embed=embeds.success(f"Sketch {channel.mention} created."))
 
+    # remember audit log entries, so get_blame doesn't have to go over REST
+    @commands.Cog.listener("on_audit_log_entry_create")
+    async def on_audit_log_entry(self, entry: disnake.AuditLogEntry):
+        audit_log.add(entry)
+
+    # forget resolved config().channels/categories/roles when they might
+    # have changed
+    @commands.Cog.listener("on_guild_channel_create")
+    @commands.Cog.listener("on_guild_channel_delete")
+    async def on_channels_change(self, channel: disnake.abc.GuildChannel):
+        GuildElementByName.invalidate(
+            channel.guild, "categories", "text_channels")
+
+    @commands.Cog.listener("on_guild_channel_update")
+    async def on_channel_rename(self,
+                                before: disnake.abc.GuildChannel,
+                                after: disnake.abc.GuildChannel):
+        if before.name != after.name:
+            GuildElementByName.invalidate(
+                after.guild, "categories", "text_channels")
+
+    @commands.Cog.listener("on_guild_role_create")
+    @commands.Cog.listener("on_guild_role_delete")
+    async def on_roles_change(self, role: disnake.Role):
+        GuildElementByName.invalidate(role.guild, "roles")
+
+    @commands.Cog.listener("on_guild_role_update")
+    async def on_role_rename(self, before: disnake.Role, after: disnake.Role):
+        if before.name != after.name:
+            GuildElementByName.invalidate(after.guild, "roles")
+
     # channel remove (check if wip)
     @commands.Cog.listener("on_guild_channel_delete")
     async def on_channel_remove(self, channel: disnake.abc.GuildChannel):
         # delete from sketches if necessary
-        state().sketches = [
-            sketch for sketch in state().sketches if sketch.channel != channel]
+        if (sketch := state().sketch(channel.id)):
+            await state().remove_sketch(sketch)
+
+        # don't do anything if we deleted the channel. this goes before the
+        # lookup, since whatever we deleted may already be out of state
+        if ledger.consume(disnake.AuditLogAction.channel_delete, channel.id):
+            return
 
         # get wip
-        wip = disnake.utils.get(state().wips, channel=channel)
+        wip = state().wip(channel.id)
         if not wip:
             return
         assert(isinstance(channel, disnake.TextChannel))
 
-        # don't do anything if we deleted the channel
         blamed = await get_blame(
             guild=channel.guild,
             action=disnake.AuditLogAction.channel_delete,
@@ -223,16 +269,20 @@ class EventCog(commands.Cog):
             return
 
         await wip.without_channel(author=blamed)
-        state().wips = [wip for wip in state().wips if wip.channel != channel]
+        await state().remove_wip(wip)
 
     # role remove (check if wip)
     @commands.Cog.listener("on_guild_role_delete")
     async def on_role_remove(self, role: disnake.Role):
-        wip = disnake.utils.get(state().wips, role=role)
+        # don't do anything if we deleted the role (archived wips are out of
+        # state by the time this comes in, so check first)
+        if ledger.consume(disnake.AuditLogAction.role_delete, role.id):
+            return
+
+        wip = state().wip_by_role(role.id)
         if not wip:
             return
 
-        # don't do anything if we deleted the role
         blamed = await get_blame(
             guild=role.guild,
             action=disnake.AuditLogAction.role_delete,
@@ -241,46 +291,89 @@ class EventCog(commands.Cog):
             return
 
         await wip.reconstruct_role(author=blamed)
+        await state().update_wip(wip)
+
+    # keep the membership cache in sync with role changes
+    @commands.Cog.listener("on_member_update")
+    async def on_member_update(self,
+                               before: disnake.Member,
+                               after: disnake.Member):
+        membership.on_member_update(before, after)
 
     # channel name change (check if wip)
     @commands.Cog.listener("on_guild_channel_update")
     async def on_channel_update(self, _, channel: disnake.abc.GuildChannel):
-        wip = disnake.utils.get(state().wips, channel__id=channel.id)
+        # don't do anything if we changed the name (or set the channel up
+        # for /wipify, before it was a wip)
+        if ledger.consume(disnake.AuditLogAction.channel_update, channel.id):
+            return
+
+        wip = state().wip(channel.id)
         if not wip:
             return
         assert(isinstance(channel, disnake.TextChannel))
 
-        # don't do anything if we changed the name
-        blamed = await get_blame(
-            guild=channel.guild,
-            action=disnake.AuditLogAction.channel_update,
-            target_id=channel.id)
-        if blamed and blamed.id == channel.guild.me.id:
+        # permission tweaks, position shifts, etc. don't matter to us
+        if channel.name == wip._get_channel_name(wip.name, wip.progress):
             return
 
-        if channel.name != wip._get_channel_name(wip.name, wip.progress):
-            await wip.edit()
+        await self.mark_dirty(wip, disnake.AuditLogAction.channel_update,
+                              channel.id)
 
     @commands.Cog.listener("on_guild_role_update")
     async def on_role_update(self, _, role: disnake.Role):
-        wip = disnake.utils.get(state().wips, role=role)
+        if ledger.consume(disnake.AuditLogAction.role_update, role.id):
+            return
+
+        wip = state().wip_by_role(role.id)
         if not wip:
             return
 
+        if role.name == wip.name:
+            return
+
+        await self.mark_dirty(wip, disnake.AuditLogAction.role_update, role.id)
+
+    async def mark_dirty(self, wip: Wip, action: disnake.AuditLogAction,
+                         target_id: int):
         blamed = await get_blame(
-            guild=role.guild,
-            action=disnake.AuditLogAction.role_update,
-            target_id=role.id)
-        if blamed and blamed.id == role.guild.me.id:
+            guild=wip.guild, action=action, target_id=target_id)
+
+        # one of ours that the ledger didn't know about (from before a
+        # restart, say)
+        if blamed and blamed.id == wip.guild.me.id:
+            return
+
+        self.dirty[wip.channel.id] = blamed
+
+    @tasks.loop(seconds=5.0)
+    async def reconcile(self):
+        if not self.dirty:
             return
 
-        if role.name != wip.name:
-            await role.edit(name=wip.name)
+        dirty, self.dirty = self.dirty, {}
+        wips = [wip for channel_id in dirty
+                if (wip := state().wip(channel_id))]
+        for wip in wips:
+            if (blamed := dirty[wip.channel.id]):
+                print(f"Putting back changes to {wip.name} by {blamed}")
+
+        # one failing wip shouldn't stop the rest (or the loop)
+        results = await asyncio.gather(
+            *(wip.reconcile() for wip in wips), return_exceptions=True)
+        for wip, result in zip(wips, results):
+            if isinstance(result, Exception):
+                print(f"Couldn't reconcile {wip.name}: {result!r}")
+
+    @reconcile.before_loop
+    async def before_reconcile(self):
+        await self.bot.wait_until_ready()
 
     # user leaves (check if credited)
     @commands.Cog.listener("on_raw_member_remove")
     async def on_member_remove(self, evt: disnake.RawGuildMemberRemoveEvent):
         user = evt.user if isinstance(evt.user, disnake.User) else evt.user._user
+        membership.forget(user.id)
         if not user.mutual_guilds:
             for wip in state().wips:
                 needs_update = False
@@ -322,22 +415,8 @@ class EventCog(commands.Cog):
         if not pinned_wip and not update_wip:
             return
 
-        # get guild
-        if not evt.guild_id:
-            return None
-        guild = self.bot.get_guild(evt.guild_id)
-        if not guild:
-            return None
-
-        # don't do anything if we deleted the message
-        blamed = await get_blame(
-            guild=guild,
-            action=disnake.AuditLogAction.channel_update,
-            target_id=evt.message_id)
-        if blamed and blamed.id == guild.me.id:
-            return
-
-        # actually do stuff
+        # we never delete these ourselves, and the audit log doesn't record
+        # bots deleting their own messages anyway, so it was someone else
         if pinned_wip:
             pinned_wip.pinned = None # type: ignore
             await pinned_wip.update_pinned()
@@ -4,10 +4,14 @@ import disnake
 import aiohttp
 
 from .. import soundcloud
-from ..utils import send_error, UserError, embeds, buttons, error_handler, send_modal
+from ..utils import send_error, UserError, embeds, buttons, send_modal, \
+    ComponentRouter
 
 class OauthCog(commands.Cog):
-    def __init__(self, bot: commands.InteractionBot, sc: soundcloud.Client):
+    def __init__(self,
+                 bot: commands.InteractionBot,
+                 sc: soundcloud.Client,
+                 components: ComponentRouter):
         self.bot = bot
         self.sc = sc
         self.messages: list[disnake.Message] = []
@@ -15,13 +19,11 @@ class OauthCog(commands.Cog):
 
         self.sc.register_oauth_expire_callback(self.on_oauth_expire)
 
-    @commands.Cog.listener("on_button_click")
-    @error_handler()
-    async def on_button_click(self, inter: disnake.MessageInteraction):
-        if inter.component.custom_id == "oauthinstruction":
-            await self.handle_instruction(inter)
-        elif inter.component.custom_id == "oauthprovide":
-            await self.handle_provide(inter)
+        components.register("oauthinstruction", self.handle_instruction)
+        components.register("oauthprovide", self.handle_provide)
+
+    def cog_unload(self):
+        self.check_oauth.cancel()
 
     async def handle_instruction(self, inter: disnake.MessageInteraction):
         if not inter.author.guild_permissions.manage_guild:
@@ -1,13 +1,16 @@
 from disnake.ext import commands, tasks
 import disnake
 
-from ..utils import error_handler, buttons, get_audio_attachment, embeds
+from ..utils import error_handler, buttons, embeds, MessageRouter, MessageKind
 from ..filemethods import state
 
 class SketchCog(commands.Cog):
-    def __init__(self, bot: commands.InteractionBot):
+    def __init__(self, bot: commands.InteractionBot, router: MessageRouter):
         self.bot = bot
 
+        # bump the sketch timer whenever someone posts audio
+        router.register(MessageKind.SKETCH | MessageKind.AUDIO, self.on_audio)
+
     @commands.slash_command(
         dm_permission=False,
         default_member_permissions=disnake.Permissions.none())
@@ -35,8 +38,7 @@ class SketchCog(commands.Cog):
             ephemeral=True,
             embed=embeds.success("Embed sent!"))
 
-    @commands.Cog.listener("on_message")
-    async def on_message(self, message: disnake.Message):
-        sketch = disnake.utils.get(state().sketches, channel=message.channel)
-        if sketch and get_audio_attachment(message):
+    async def on_audio(self, message: disnake.Message):
+        sketch = state().sketch(message.channel.id)
+        if sketch:
             sketch.timestamp = disnake.utils.utcnow()
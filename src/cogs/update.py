@@ -3,42 +3,81 @@ import disnake
 
 import asyncio
 import aiohttp
+import traceback
 
-from ..utils import UserError, embeds, buttons, get_audio_attachment
-from ..datatypes import Wip, Update
-from ..filemethods import state, config
+from ..utils import UserError, embeds, buttons, error_handler, \
+    get_audio_attachment, MessageRouter, MessageKind, Debouncer, LRUCache, \
+    KeyedLock, AudioCache, ProgressReporter, probe_audio
+from ..datatypes import Wip, Update, UpdateJob, UpdateHistory, HistoryEntry
+from ..filemethods import state, config, jobs
 from .. import soundcloud
 
 UPDATE_REACTION = "\N{BELL}"
 
 class UpdateCog(commands.Cog):
     def __init__(self,
-                 bot: commands.InteractionBot, sc: soundcloud.Client):
+                 bot: commands.InteractionBot,
+                 sc: soundcloud.Client,
+                 router: MessageRouter,
+                 audio: AudioCache,
+                 history: UpdateHistory):
         self.bot = bot
         self.sc = sc
-        self.update_lock = asyncio.Lock()
+        self.audio = audio
+        self.history = history
 
-    @commands.Cog.listener("on_message")
-    async def on_message(self, message: disnake.Message):
-        # if a guild message is sent
-        if not message.guild:
-            return
+        # confirmed updates wait in here (and in jobs.json) for a worker.
+        # updates to the same wip still happen one at a time, and uploads
+        # from different wips share the upload slots
+        self.queue: asyncio.Queue[UpdateJob] = asyncio.Queue()
+        self.wip_locks = KeyedLock()
+        self.upload_slots = asyncio.Semaphore(config().upload_concurrency)
 
-        # by someone else
-        if message.author == message.guild.me:
-            return
+        # pick up whatever was left over from last time
+        for job in jobs().updates:
+            self.queue.put_nowait(job)
 
-        # with an audio attachment
-        if not get_audio_attachment(message):
-            return
+        self.workers = [asyncio.create_task(self.work())
+                        for _ in range(config().update_workers)]
 
-        # in a wip channel
-        if not disnake.utils.get(state().wips, channel__id=message.channel.id):
-            return
+        # announcements waiting on soundcloud to finish transcoding
+        self.watchers: set[asyncio.Task] = set()
+
+        # message id -> bandmates ringing its bell, earliest first
+        self.bells: dict[int, list[int]] = {}
+        self.debouncer = Debouncer(3)
+
+        # audio messages we've seen in wip channels, so reacting to one
+        # doesn't mean fetching it again
+        self.messages: LRUCache[int, disnake.Message] = LRUCache(256)
+
+        # someone else sent an audio file in a wip channel
+        router.register(MessageKind.WIP | MessageKind.AUDIO, self.on_audio)
+
+    def cog_unload(self):
+        for task in (*self.workers, *self.watchers):
+            task.cancel()
+
+    async def on_audio(self, message: disnake.Message):
+        self.messages.put(message.id, message)
 
         # react with a bell!
         await message.add_reaction(UPDATE_REACTION)
 
+    @commands.Cog.listener("on_raw_message_edit")
+    async def on_raw_message_edit(self, e: disnake.RawMessageUpdateEvent):
+        self.messages.pop(e.message_id)
+
+    @commands.Cog.listener("on_raw_message_delete")
+    async def on_raw_message_delete(self, e: disnake.RawMessageDeleteEvent):
+        self.messages.pop(e.message_id)
+
+    @commands.Cog.listener("on_raw_bulk_message_delete")
+    async def on_raw_bulk_message_delete(
+            self, e: disnake.RawBulkMessageDeleteEvent):
+        for message_id in e.message_ids:
+            self.messages.pop(message_id)
+
     @commands.Cog.listener("on_raw_reaction_add")
     async def on_raw_reaction_add(self,
                                   e: disnake.RawReactionActionEvent):
@@ -51,90 +90,142 @@ class UpdateCog(commands.Cog):
             return
 
         # in a wip channel
-        wip = disnake.utils.get(state().wips, channel__id=e.channel_id)
+        wip = state().wip(e.channel_id)
         if wip is None:
             return
 
-        # with an audio attachment
-        msg: disnake.Message = await wip.channel.fetch_message(e.message_id)
-        if not msg.attachments or \
-                not msg.attachments[0].content_type or \
-                not msg.attachments[0].content_type.startswith("audio"):
+        # and we haven't updated with this message before
+        if wip.update \
+                and wip.update.file \
+                and wip.update.file.id == e.message_id:
             return
 
         # by someone in the band
-        author = await wip.channel.guild.get_or_fetch_member(e.user_id)
+        author = e.member or await wip.guild.get_or_fetch_member(e.user_id)
         if not author:
-            return None
+            return
 
         bandmate_role = await config().roles.band_member.get(wip.guild)
         if bandmate_role not in author.roles:
             return
 
-        async with self.update_lock:
+        ringers = self.bells.setdefault(e.message_id, [])
+        if e.user_id not in ringers:
+            ringers.append(e.user_id)
 
-            # and we haven't updated with this message before
-            if wip.update \
-                    and wip.update.file \
-                    and wip.update.file.id == msg.id:
+        # and nobody un-reacts within 3 seconds
+        self.schedule_update(e.channel_id, e.message_id)
+
+    @commands.Cog.listener("on_raw_reaction_remove")
+    async def on_raw_reaction_remove(self,
+                                     e: disnake.RawReactionActionEvent):
+        if str(e.emoji) != UPDATE_REACTION:
+            return
+
+        ringers = self.bells.get(e.message_id)
+        if not ringers or e.user_id not in ringers:
+            return
+        ringers.remove(e.user_id)
+
+        # we have to handle a situation like this:
+        # - user a reacts
+        # - user b reacts
+        # - user a unreacts
+        # and correctly determine the person who requested the update.
+        if ringers:
+            self.schedule_update(e.channel_id, e.message_id)
+        else:
+            del self.bells[e.message_id]
+            self.debouncer.cancel(e.message_id)
+
+    def schedule_update(self, channel_id: int, message_id: int):
+        # look the wip up when the timer fires, since it might have been
+        # archived while we were waiting
+        self.debouncer.schedule(
+            message_id,
+            lambda: self.confirm_update(state().wip(channel_id), message_id))
+
+    @error_handler()
+    async def confirm_update(self, wip: Wip | None, message_id: int):
+        ringers = self.bells.pop(message_id, None)
+        if not ringers or wip is None:
+            return
+
+        # with an audio attachment
+        msg = self.messages.get(message_id)
+        if msg is None:
+            try:
+                msg = await wip.channel.fetch_message(message_id)
+            except disnake.NotFound:
                 return
+            self.messages.put(message_id, msg)
 
-            def check(e_: disnake.RawReactionActionEvent):
-                assert(author)
-                return e_.user_id == author.id and \
-                    str(e_.emoji) == UPDATE_REACTION
+        if not get_audio_attachment(msg):
+            return
 
-            # and they don't un-react within 3 seconds
-            async with wip.channel.typing():
+        # earliest bell that's still there requested the update
+        author = await wip.guild.get_or_fetch_member(ringers[0])
+        if not author:
+            return
+
+        if wip.update \
+                and wip.update.file \
+                and wip.update.file.id == msg.id:
+            return
+
+        if jobs().queued(msg.id):
+            return
+
+        embed = self.status_embed(author)
+        if self.queue.qsize() >= len(self.workers):
+            embed.description = "Waiting for other updates to finish..."
+
+        job = UpdateJob(file=msg, requester=author,
+                        reply=await msg.reply(embed=embed))
+        await jobs().add_update(job)
+        self.queue.put_nowait(job)
+
+    async def work(self):
+        while True:
+            job = await self.queue.get()
+            cancelled = False
+            try:
+                wip = state().wip(job.file.channel.id)
+                if wip is not None:
+                    await self.run_update(wip, job)
+            except asyncio.CancelledError:
+                cancelled = True
+                raise
+            except Exception as e:
+                # a bad job shouldn't take the worker down with it.
+                # create_update has already told whoever asked for it, so
+                # this just needs to end up in the logs
+                print(f"Update job for {job.file.jump_url} failed:")
+                traceback.print_exception(e)
+            finally:
+                # only a cancelled job (we're shutting down) stays saved,
+                # to be picked up again next time
                 try:
-                    # we loop here because we have to handle a situation like
-                    # this:
-                    # - user a reacts
-                    # - user b reacts
-                    # - user a unreacts
-                    # and correctly determine the person who requested the
-                    # update.
-                    while True:
-                        await self.bot.wait_for(
-                            "raw_reaction_remove",
-                            check=check, timeout=3)
-                        # we didn't time out, there's a reaction removal
-                        print("hi!")
-
-                        # see if anyone else reacted
-                        msg = await wip.channel.fetch_message(e.message_id)
-                        bells = disnake.utils.get(
-                            msg.reactions, emoji=UPDATE_REACTION)
-                        if not bells:
-                            return
-
-                        # find non-bot user in bells and run again
-                        async for user in bells.users():
-                            # we found a non-bot user
-                            if user != wip.guild.me:
-                                assert isinstance(user, disnake.Member)
-                                author = user
-                                break
-                        else:
-                            # all reactions were removed
-                            return
-
-                # message got deleted
-                except disnake.NotFound:
-                    return
-                # reaction didn't get removed
-                except asyncio.TimeoutError:
-                    pass
+                    if not cancelled:
+                        await jobs().remove_update(job)
+                finally:
+                    self.queue.task_done()
 
-            # update
-            await self.create_update(author=author, file_msg=msg, wip=wip)
+    async def run_update(self, wip: Wip, job: UpdateJob):
+        author = await wip.guild.get_or_fetch_member(job.requester.id)
+        if not author:
+            return
 
-    # TODO update to new error handler
-    async def create_update(self,
-                            author: disnake.Member,
-                            file_msg: disnake.Message,
-                            wip: Wip):
-        # send embed
+        async with self.wip_locks(wip.channel.id):
+            if wip.update \
+                    and wip.update.file \
+                    and wip.update.file.id == job.file.id:
+                return
+
+            await self.create_update(author=author, file_msg=job.file,
+                                     wip=wip, reply=job.reply)
+
+    def status_embed(self, author: disnake.Member) -> disnake.Embed:
         embed = disnake.Embed(
             color=disnake.Color.blue(),
             title="Updating..."
@@ -143,11 +234,25 @@ class UpdateCog(commands.Cog):
             text=f"{author.global_name} requested this update.",
             icon_url=embeds.WUCK
         )
-        reply = await file_msg.reply(embed=embed)
+        return embed
+
+    # TODO update to new error handler
+    async def create_update(self,
+                            author: disnake.Member,
+                            file_msg: disnake.Message,
+                            wip: Wip,
+                            reply: disnake.Message | None = None):
+        # send embed (or take over the one from when this was queued)
+        status = self.status_embed(author)
+        if reply is None:
+            reply = await file_msg.reply(embed=status)
 
         async def edit_status(msg: str):
-            embed.description = msg
-            await reply.edit(embed=embed)
+            status.description = msg
+            await reply.edit(embed=status)
+
+        # stages can go by faster than it's worth editing the reply for
+        progress = ProgressReporter(edit_status, config().status_interval)
 
         guild = author.guild
 
@@ -159,19 +264,27 @@ class UpdateCog(commands.Cog):
                 except disnake.NotFound:
                     pass
 
+        # stages that don't depend on each other run side by side. anything
+        # still running when we bail out gets cancelled in the finally
+        tasks: list[asyncio.Task] = []
+        def start(coro) -> asyncio.Task:
+            task = asyncio.create_task(coro)
+            tasks.append(task)
+            return task
+
+        audio = None
         try:
-            # get wips playlist
-            wips_playlist = None
-            async for pl in self.sc.me.playlists():
-                if pl.title.lower() == "wips":
-                    wips_playlist = pl
-                    break
-            else:
-                raise UserError("Could not find a playlist named 'wips'.")
-
-            updates_channel = await config().channels.updates.get(guild)
-
-            await edit_status(
+            # turn away anything soundcloud won't take before doing
+            # anything that costs us
+            attachment = file_msg.attachments[0]
+            await probe_audio(self.audio, attachment,
+                              config().max_upload_megabytes * 1000 * 1000)
+
+            # look these up while the audio downloads
+            playlist_task = start(self.find_wips_playlist())
+            channel_task = start(config().channels.updates.get(guild))
+
+            progress.update(
                 "Getting SoundCloud accounts for credited members...")
             # generate soundcloud description
             description = wip.soundcloud_description()
@@ -180,27 +293,57 @@ class UpdateCog(commands.Cog):
             # until they link themselves
             wip.raise_on_unlinked_members()
 
-            if wip.track:
-                await edit_status("Deleting old track...")
-                try:
-                    await wip.track.delete()
-                except aiohttp.ClientResponseError as e:
-                    if e.status != 404:
-                        raise e
-
-            # upload to soundcloud
-            await edit_status("Uploading new track...")
-
-            wip.track = await self.sc.upload_track(
-                file_url=file_msg.attachments[0].url,
-                title=wip.name,
-                description=description,
-                tags="wip"
-            )
-            await wips_playlist.add_track(wip.track, top=True)
-
-            # send update message to #updates
-            await edit_status(f"Sending to {updates_channel.mention}...")
+            # grab the file once, for both soundcloud and #updates
+            progress.update("Downloading audio...")
+            audio = await self.audio.open(attachment)
+            digest = self.audio.digest(attachment)
+
+            # but make sure they worked before touching the old track
+            wips_playlist, updates_channel = \
+                await asyncio.gather(playlist_task, channel_task)
+
+            # the exact same audio is already up (a re-ring, or a retry
+            # after something later on failed), so just refresh its details
+            reused = False
+            if wip.track and digest and wip.track_hash == digest:
+                progress.update("Updating track details...")
+                reused = await self.refresh_track(wip, description)
+
+            if not reused:
+                progress.update("Uploading new track...")
+
+                def uploaded(sent: int, total: int):
+                    if total:
+                        progress.update(f"Uploading new track... "
+                                        f"{sent * 100 // total}%")
+
+                if self.upload_slots.locked():
+                    progress.update("Waiting for other uploads to finish...")
+
+                async with self.upload_slots:
+                    uid = await self.sc.upload_audio(
+                        audio,
+                        filename=attachment.filename,
+                        progress=uploaded,
+                        timeout=config().upload_timeout)
+
+                # the old track only goes once the new audio is safely up
+                # (if the upload fails, the wip keeps its track), and it has
+                # to be gone before the new one takes its permalink
+                await self.delete_track(wip.track)
+
+                wip.track = await self.sc.publish_track(
+                    uid,
+                    filename=attachment.filename,
+                    title=wip.name,
+                    description=description,
+                    tags="wip"
+                )
+                wip.track_hash = digest
+
+            # send update message to #updates while the playlist is edited
+            progress.update(f"Sending to {updates_channel.mention}...")
+            playlist_edit = start(wips_playlist.add_track(wip.track, top=True))
 
             embed = wip.update_embed()
 
@@ -213,8 +356,18 @@ class UpdateCog(commands.Cog):
             )
 
             # send file in a separate message (just looks a bit better, imo)
-            file = await file_msg.attachments[0].to_file()
-            await update_msg.reply(file=file)
+            audio.seek(0)
+            await update_msg.reply(
+                file=disnake.File(audio, filename=attachment.filename))
+            await playlist_edit
+
+            # the announcement doesn't wait on transcoding, but its link
+            # only turns clickable once the track can actually be played
+            if not wip.track.playable:
+                watcher = asyncio.create_task(
+                    self.link_when_playable(wip, update_msg))
+                self.watchers.add(watcher)
+                watcher.add_done_callback(self.watchers.discard)
 
             # save!
             wip.update = Update(
@@ -222,22 +375,85 @@ class UpdateCog(commands.Cog):
                 message=update_msg,
                 timestamp=disnake.utils.utcnow()
             )
+            wip.mark_synced("update")
+            await state().update_wip(wip)
 
-            # update pinned
-            await wip.update_pinned()
+            await self.history.record(wip.channel.id, HistoryEntry(
+                timestamp=wip.update.timestamp,
+                requester=author.id,
+                file=(file_msg.channel.id, file_msg.id),
+                announcement=(update_msg.channel.id, update_msg.id),
+                track=wip.track.url))
 
-            await reply.edit(embed=embeds.success(
-                f"Update requested by {author.mention} was successful.\n"
-                f"[View it here.]({update_msg.jump_url})"))
+            # update pinned
+            await progress.close()
+            await asyncio.gather(
+                wip.update_pinned(),
+                reply.edit(embed=embeds.success(
+                    f"Update requested by {author.mention} was successful.\n"
+                    f"[View it here.]({update_msg.jump_url})")))
 
         except UserError as e:
             embed = embeds.error(e.args[0])
             await remove_author_reaction()
+            await progress.close()
             await reply.edit(embed=embed)
 
         except Exception as e:
             embed = embeds.error(
                 f"Unknown exception ({type(e).__name__}) raised. Tell Aria!")
+            await progress.close()
             await reply.edit(embed=embed)
             await remove_author_reaction()
             raise e
+
+        finally:
+            for task in tasks:
+                task.cancel()
+            await progress.close()
+            if audio:
+                audio.close()
+
+    async def find_wips_playlist(self) -> soundcloud.Playlist:
+        async for pl in self.sc.me.playlists():
+            if pl.title.lower() == "wips":
+                return pl
+        raise UserError("Could not find a playlist named 'wips'.")
+
+    async def link_when_playable(self, wip: Wip, update_msg: disnake.Message):
+        track = await self.sc.wait_for_transcoding(
+            wip.track, timeout=config().transcode_timeout)
+        if track is None:
+            print(f"{wip.name} didn't finish transcoding")
+            return
+
+        # (unless a newer update has replaced it already)
+        if wip.track == track:
+            wip.track.state = track.state
+
+        try:
+            await update_msg.edit(components=[
+                buttons.wip_join(wip),
+                buttons.track_link(track)
+            ])
+        except disnake.NotFound:
+            pass
+
+    # False if the track's gone, and needs uploading again after all
+    async def refresh_track(self, wip: Wip, description: str) -> bool:
+        try:
+            await wip.track.edit(title=wip.name, description=description)
+        except aiohttp.ClientResponseError as e:
+            if e.status != 404:
+                raise e
+            return False
+        return True
+
+    async def delete_track(self, track: soundcloud.Track | None):
+        if not track:
+            return
+        try:
+            await track.delete()
+        except aiohttp.ClientResponseError as e:
+            if e.status != 404:
+                raise e
@@ -1,12 +1,14 @@
 import disnake
 from disnake.ext import commands
 
-from ..utils import embeds, error_handler, UserError, send_modal
-from ..datatypes import Wip
+from ..utils import embeds, error_handler, UserError, send_modal, \
+    membership, jump_url
+from ..datatypes import Wip, UpdateHistory
 from .. import soundcloud, state
 
 from typing import Optional
 from functools import wraps
+from datetime import timedelta
 
 from inspect import signature
 
@@ -14,7 +16,7 @@ def _wip_wrapper(f):
     @wraps(f)
     async def _inner(self, inter: disnake.ApplicationCommandInteraction,
                      *args, **kwargs):
-        wip = disnake.utils.get(state().wips, channel=inter.channel)
+        wip = state().wip(inter.channel.id)
         if wip is None:
             raise UserError("You are not in a WIP channel.")
         return await f(self, inter, wip, *args, **kwargs)
@@ -33,9 +35,11 @@ def _wip_wrapper(f):
 class WipCog(commands.Cog):
     def __init__(self,
                  bot: commands.InteractionBot,
-                 sc: soundcloud.Client):
+                 sc: soundcloud.Client,
+                 history: UpdateHistory):
         self.bot = bot
         self.sc = sc
+        self.history = history
 
     @commands.slash_command(
         dm_permission=False,
@@ -61,6 +65,7 @@ class WipCog(commands.Cog):
             raise UserError(f"{user.mention} is already in this WIP!")
 
         await user.add_roles(wip.role)
+        membership.add(user, wip.role)
         await inter.response.send_message(
             ephemeral=True,
             embed=embeds.success(
@@ -84,6 +89,7 @@ class WipCog(commands.Cog):
 
         if user is None:
             await inter.author.remove_roles(wip.role)
+            membership.discard(inter.author, wip.role)
             await inter.send(embed=embeds.success(
                 "You have been removed from this WIP."), ephemeral=True)
             return
@@ -91,6 +97,7 @@ class WipCog(commands.Cog):
         if wip.role not in user.roles:
             raise UserError(f"{user.mention} is not in this WIP!")
         await user.remove_roles(wip.role)
+        membership.discard(user, wip.role)
         await inter.response.send_message(
             ephemeral=True,
             embed=embeds.success(
@@ -173,11 +180,65 @@ class WipCog(commands.Cog):
             if user == inter.author:
                 response = f"You have been added as a {credit_type}."
 
-        # this forces an update of all embeds + soundcloud
+        # this updates all embeds + soundcloud
         await wip.edit()
         await inter.response.send_message(
             ephemeral=True, embed=embeds.success(response))
 
+    @wip.sub_command()
+    @error_handler()
+    @_wip_wrapper
+    async def history(self,
+                      inter: disnake.ApplicationCommandInteraction,
+                      wip: Wip,
+                      days: Optional[commands.Range[int, 1, 3650]] = None):
+        """
+        Lists the updates this WIP has had, newest first.
+
+        Parameters
+        -----------
+        days: Only show updates from this many days back.
+        """
+        everything = await self.history.entries(wip.channel.id)
+        if days is None:
+            entries = everything
+        else:
+            entries = await self.history.since(
+                wip.channel.id,
+                disnake.utils.utcnow() - timedelta(days=days))
+
+        if not entries:
+            raise UserError("This WIP hasn't had any updates yet."
+                            if days is None else
+                            f"This WIP hasn't been updated in {days} days.")
+
+        # newest first, and only as many as fit in an embed
+        lines = []
+        for number, entry in reversed(list(enumerate(entries, start=1))):
+            line = (f"**#{number}** "
+                    f"{disnake.utils.format_dt(entry.timestamp, 'f')} "
+                    f"by <@{entry.requester}>: "
+                    f"[announcement]({jump_url(wip.guild.id, entry.announcement)})"
+                    f" · [file]({jump_url(wip.guild.id, entry.file)})")
+            if entry.track:
+                line += f" · [track]({entry.track})"
+            if sum(len(l) + 1 for l in lines) + len(line) > 3800:
+                lines.append(f"...and {number} more.")
+                break
+            lines.append(line)
+
+        embed = disnake.Embed(
+            color=disnake.Color.blurple(),
+            title=f"\N{SCROLL} Update history: {wip.name}",
+            description="\n".join(lines))
+        embed.set_footer(
+            text=f"{len(everything)} updates in "
+                 f"total. Last update",
+            icon_url=embeds.WUCK)
+        embed.timestamp = everything[-1].timestamp
+
+        await inter.response.send_message(ephemeral=True, embed=embed)
+
     async def link_soundcloud(self,
                               inter: disnake.ApplicationCommandInteraction,
                               user: disnake.abc.User):
@@ -1,7 +1,8 @@
 import disnake
 from disnake.ext import commands
 
-from ..utils import embeds, buttons, send_modal, error_handler, UserError, get_audio_attachment
+from ..utils import embeds, buttons, send_modal, error_handler, UserError, \
+    get_audio_attachment, MessageRouter, MessageKind, AudioCache
 from ..datatypes import Wip
 from .. import soundcloud
 from ..filemethods import state, config
@@ -10,20 +11,19 @@ from ..filemethods import state, config
 class WipifyCog(commands.Cog):
     def __init__(self,
                  bot: commands.InteractionBot,
-                 sc: soundcloud.Client):
+                 sc: soundcloud.Client,
+                 router: MessageRouter,
+                 audio: AudioCache):
         self.bot = bot
         self.sc = sc
+        self.audio = audio
+
+        router.register(
+            MessageKind.WIP | MessageKind.PINS_NOTICE, self.on_pins_notice)
 
     # delete all bot pin messages
-    @commands.Cog.listener()
-    async def on_message(self, message: disnake.Message):
-        if message.type == disnake.MessageType.pins_add \
-                and message.guild is not None \
-                and message.author.id == message.guild.me.id \
-                and isinstance(message.channel, disnake.TextChannel) \
-                and message.channel.category is not None \
-                and message.channel.category.name == "WIPs":
-            await message.delete()
+    async def on_pins_notice(self, message: disnake.Message):
+        await message.delete()
 
     # sends the wip modal and validates all input text
     async def _send_wip_modal(self,
@@ -81,7 +81,7 @@ class WipifyCog(commands.Cog):
         """
 
         is_sketch = bool(
-            disnake.utils.get(state().sketches, channel=inter.channel))
+            state().sketch(inter.channel.id))
 
         # create modal
         modal = await self._send_wip_modal(
@@ -150,7 +150,7 @@ class WipifyCog(commands.Cog):
                                      extra_members=list({
                                          inter.author, message.author}))
 
-        await wip.channel.send(file=await attachment.to_file())
+        await wip.channel.send(file=await self.audio.to_file(attachment))
 
         embed = disnake.Embed(
             color=disnake.Color.blue(),
@@ -3,7 +3,8 @@ import disnake
 
 from typing import Optional
 
-from ..utils import error_handler, UserError, embeds, buttons
+from ..utils import error_handler, UserError, embeds, membership
+from ..utils.pages import pages, SORTS
 from ..datatypes import Wip
 from .. import state, config
 
@@ -50,36 +51,37 @@ class WipsCog(commands.Cog):
             inter: disnake.AppCommandInteraction,
             wip: Optional[str] = commands.Param(
                 default=None,
-                autocomplete=view_autocomplete)):
+                autocomplete=view_autocomplete),
+            sort: str = commands.Param(
+                default="newest",
+                choices=list(SORTS))):
         """
         Opens an index of all WIPs, with option to join each one.
 
         Parameters
         ----------
-        wip: The WIP to view. Defaults to the newest one.
+        wip: The WIP to view. Defaults to the first one.
+        sort: How to order the WIPs. Defaults to newest first.
         """
         if wip:
-            index = [wip.name.lower() for wip in state().wips].index(
-                wip.lower())
+            wip_ = disnake.utils.find(
+                lambda w: w.name.lower() == wip.lower(), state().wips)
         else:
-            index = len(state().wips) - 1
+            wip_ = pages.first(sort)
+
+        if not wip_:
+            raise UserError("Could not find that WIP.")
 
-        wip_ = state().wips[index]
         await inter.response.send_message(
             ephemeral=True,
-            embed=wip_.view_embed(),
-            components=[
-                buttons.wip_view_prev(index - 1),
-                buttons.wip_toggle(wip_, inter.author),
-                buttons.wip_view_next(index + 1)
-            ])
+            **pages.render(sort, wip_, inter.author))
 
     @staticmethod
     async def join_autocomplete(inter: disnake.AppCommandInteraction,
                                 user_input: str):
         # only get WIPs the author is not in
-        roles = inter.author.roles
-        wips = [wip.name for wip in state().wips if wip.role not in roles]
+        roles = membership.roles(inter.author)
+        wips = [wip.name for wip in state().wips if wip.role.id not in roles]
 
         return [name for name in wips if user_input.lower() in name.lower()]
 
@@ -99,9 +101,10 @@ class WipsCog(commands.Cog):
         real_wip = disnake.utils.get(state().wips, name=wip)
         if real_wip is None:
             raise UserError("Could not find that WIP.")
-        if real_wip.role in inter.author.roles:
+        if membership.in_wip(inter.author, real_wip.role):
             raise UserError("You're already in that WIP!")
         await inter.author.add_roles(real_wip.role)
+        membership.add(inter.author, real_wip.role)
         await inter.response.send_message(
             ephemeral=True, embed=embeds.success(
                 f"You have been added to {real_wip.channel.mention}.\n"
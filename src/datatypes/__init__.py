@@ -1,13 +1,19 @@
-from .files import State, Config, Tokens
+from .files import State, Config, Tokens, Jobs
 from .wip import Wip, Update, Credit
 from .sketch import Sketch
+from .job import UpdateJob
+from .history import HistoryEntry, UpdateHistory
 
 __all__ = [
     "State",
     "Config",
     "Tokens",
+    "Jobs",
     "Wip",
     "Update",
     "Credit",
     "Sketch",
+    "UpdateJob",
+    "HistoryEntry",
+    "UpdateHistory",
 ]
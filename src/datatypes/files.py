@@ -1,5 +1,7 @@
 import disnake
-from typing import Annotated
+from typing import Annotated, Optional
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
 
 from ..validator import JsonFile, TypedDict, CategoryByName, RoleByName, \
     TextChannelByName
@@ -7,6 +9,7 @@ from .. import soundcloud
 
 from .wip import Wip
 from .sketch import Sketch
+from .job import UpdateJob
 
 class Config(JsonFile):
     class Categories(TypedDict):
@@ -36,6 +39,30 @@ class Config(JsonFile):
     guild: disnake.Guild
 
     admin: disnake.User | None = None
+
+    # how many queued updates get worked on at once
+    update_workers: int = 2
+
+    # how many soundcloud uploads can be running at once
+    upload_concurrency: int = 2
+
+    # how much downloaded audio to keep around on disk (1 MB = 1000 * 1000
+    # bytes, same as max_upload_megabytes)
+    audio_cache_megabytes: int = 512
+
+    # minimum seconds between edits to a progress message
+    status_interval: int = 2
+
+    # bigger audio files get turned away before we try uploading them
+    max_upload_megabytes: int = 4000
+
+    # how long one attempt at uploading a track can take, in seconds
+    upload_timeout: int = 600
+
+    # how long to wait on soundcloud transcoding an upload before giving up
+    # on making its link clickable
+    transcode_timeout: int = 600
+
     channels: Channels
     categories: Categories
     roles: Roles
@@ -44,7 +71,136 @@ class Tokens(JsonFile):
     discord: str
     soundcloud: str
 
+class Jobs(JsonFile):
+    # oldest first
+    updates: Annotated[list[UpdateJob], list]
+
+    def queued(self, message_id: int) -> bool:
+        return any(job.file.id == message_id for job in self.updates)
+
+    async def add_update(self, job: UpdateJob):
+        self.updates.append(job)
+        await self.save()
+
+    async def remove_update(self, job: UpdateJob):
+        self.updates = [j for j in self.updates if j is not job]
+        await self.save()
+
+# how many State.transaction()s the current task is inside of. it's per
+# task, so one coroutine batching its changes doesn't hold up anyone else's
+_transaction_depth: ContextVar[int] = ContextVar(
+    "transaction_depth", default=0)
+
 class State(JsonFile):
     wips: list[Wip]
     sketches: list[Sketch]
     links: dict[Annotated[disnake.User, "discord"], Annotated[soundcloud.User, "soundcloud"]]
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+
+        # bumped on every change to wips or sketches (whether or not it's
+        # been saved yet), so anything caching on top of state can tell when
+        # it's gone stale
+        self.version = 0
+
+        self._wips: Optional[dict[int, Wip]] = None
+        self._sketches: Optional[dict[int, Sketch]] = None
+        self._roles: Optional[tuple[int, dict[int, Wip]]] = None
+        self._dirty = False
+        self._removed = False
+
+    # the lists are what gets saved, but lookups go through these. they're
+    # both keyed by channel id and kept in the same order as the lists.
+    @property
+    def wips_by_channel(self) -> dict[int, Wip]:
+        if self._wips is None:
+            self._wips = {wip.channel.id: wip for wip in self.wips}
+        return self._wips
+
+    @property
+    def sketches_by_channel(self) -> dict[int, Sketch]:
+        if self._sketches is None:
+            self._sketches = {s.channel.id: s for s in self.sketches}
+        return self._sketches
+
+    # roles can be swapped out from under a wip (see Wip.reconstruct_role),
+    # so this one is just rebuilt whenever the version moves
+    @property
+    def wips_by_role(self) -> dict[int, Wip]:
+        if self._roles is None or self._roles[0] != self.version:
+            self._roles = (self.version, {wip.role.id: wip for wip
+                                          in self.wips_by_channel.values()
+                                          if wip.role})
+        return self._roles[1]
+
+    def wip(self, channel_id: int) -> Optional[Wip]:
+        return self.wips_by_channel.get(channel_id)
+
+    def wip_by_role(self, role_id: int) -> Optional[Wip]:
+        return self.wips_by_role.get(role_id)
+
+    def sketch(self, channel_id: int) -> Optional[Sketch]:
+        return self.sketches_by_channel.get(channel_id)
+
+    # batches saving: removals only rebuild the lists once, and the save
+    # happens once the current task's outermost transaction exits. lookups
+    # and the version see every change straight away. lists can still hold
+    # removed entries until then, so it's safe to remove things while
+    # iterating over them.
+    #
+    # don't hold one open across network calls, since nothing gets saved
+    # until it closes.
+    @asynccontextmanager
+    async def transaction(self):
+        token = _transaction_depth.set(_transaction_depth.get() + 1)
+        try:
+            yield self
+        finally:
+            _transaction_depth.reset(token)
+            if _transaction_depth.get() == 0 and self._dirty:
+                await self._commit()
+
+    async def _commit(self):
+        if self._removed:
+            wips, sketches = self.wips_by_channel, self.sketches_by_channel
+            self.wips = [w for w in self.wips
+                         if wips.get(w.channel.id) is w]
+            self.sketches = [s for s in self.sketches
+                             if sketches.get(s.channel.id) is s]
+
+        self._dirty = False
+        self._removed = False
+        await self.save()
+
+    async def _mutated(self, removed: bool = False):
+        self.version += 1
+        self._dirty = True
+        self._removed = self._removed or removed
+        if _transaction_depth.get() == 0:
+            await self._commit()
+
+    async def add_wip(self, wip: Wip):
+        self.wips_by_channel[wip.channel.id] = wip
+        self.wips.append(wip)
+        await self._mutated()
+
+    async def remove_wip(self, wip: Wip):
+        if self.wips_by_channel.get(wip.channel.id) is wip:
+            del self.wips_by_channel[wip.channel.id]
+            await self._mutated(removed=True)
+
+    # for when a wip changes in a way that matters to anything indexing it
+    # (name, progress, role, latest update...)
+    async def update_wip(self, _: Wip):
+        await self._mutated()
+
+    async def add_sketch(self, sketch: Sketch):
+        self.sketches_by_channel[sketch.channel.id] = sketch
+        self.sketches.append(sketch)
+        await self._mutated()
+
+    async def remove_sketch(self, sketch: Sketch):
+        if self.sketches_by_channel.get(sketch.channel.id) is sketch:
+            del self.sketches_by_channel[sketch.channel.id]
+            await self._mutated(removed=True)
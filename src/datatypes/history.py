@@ -0,0 +1,77 @@
+import asyncio
+import json
+
+from bisect import bisect_left
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+from ..utils import KeyedLock, MessageRef
+from ..validator import TypedDict, Registrar
+
+# one update. it's all plain ids, so reading history back never has to ask
+# discord (or soundcloud) for anything
+class HistoryEntry(TypedDict):
+    timestamp: datetime
+    requester: int
+    file: MessageRef
+    announcement: MessageRef
+    track: str | None = None
+
+
+# every update each wip has had. a wip's history is an append-only jsonl
+# file named after its channel id, kept out of state.json since it only ever
+# grows. files are read the first time they're asked for, then kept in
+# memory oldest first, so time ranges are just a bisect.
+class UpdateHistory:
+    def __init__(self, root: str | Path, registrar: Registrar):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.registrar = registrar
+        self._entries: dict[int, list[HistoryEntry]] = {}
+        self._locks = KeyedLock()
+
+    def _path(self, channel_id: int) -> Path:
+        return self.root / f"{channel_id}.jsonl"
+
+    def _read(self, channel_id: int) -> list[dict]:
+        if not (path := self._path(channel_id)).exists():
+            return []
+        with path.open("r") as fp:
+            return [json.loads(line) for line in fp if line.strip()]
+
+    def _append(self, channel_id: int, data: dict):
+        with self._path(channel_id).open("a") as fp:
+            fp.write(json.dumps(data, separators=(",", ":")) + "\n")
+
+    async def entries(self, channel_id: int) -> list[HistoryEntry]:
+        async with self._locks(channel_id):
+            if channel_id not in self._entries:
+                raw = await asyncio.to_thread(self._read, channel_id)
+                entries = await asyncio.gather(
+                    *(self.registrar.deserialize(data, HistoryEntry)
+                      for data in raw))
+                self._entries[channel_id] = sorted(
+                    (e for e in entries if e), key=lambda e: e.timestamp)
+        return self._entries[channel_id]
+
+    async def record(self, channel_id: int, entry: HistoryEntry):
+        entries = await self.entries(channel_id)
+        data = await self.registrar.serialize(entry, HistoryEntry)
+        await asyncio.to_thread(self._append, channel_id, data)
+
+        # clocks only go forwards, almost always
+        index = bisect_left(entries, entry.timestamp,
+                            key=lambda e: e.timestamp)
+        entries.insert(index, entry)
+
+    async def latest(self, channel_id: int) -> Optional[HistoryEntry]:
+        entries = await self.entries(channel_id)
+        return entries[-1] if entries else None
+
+    # oldest first
+    async def since(self, channel_id: int,
+                    start: datetime) -> list[HistoryEntry]:
+        entries = await self.entries(channel_id)
+        index = bisect_left(entries, start, key=lambda e: e.timestamp)
+        return entries[index:]
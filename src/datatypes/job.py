@@ -0,0 +1,19 @@
+import disnake
+
+from ..validator import TypedDict, without
+
+# a confirmed bell that hasn't turned into an update yet. these get saved as
+# soon as they're queued, so a restart halfway through an upload just means
+# starting that update over.
+class UpdateJob(TypedDict):
+    # the audio message in the wip channel
+    file: disnake.Message
+    requester: disnake.User
+
+    # our "Updating..." reply, once it's been sent
+    reply: disnake.Message | None = None
+
+    # the file (or whoever rang for it) is gone, so there's nothing to do
+    @without("file", "requester")
+    async def without_file(self):
+        pass
@@ -7,7 +7,8 @@ from datetime import datetime
 
 from ..validator import TypedDict, without, default
 from ..utils.errors import UserError, send_error
-from ..utils import embeds, buttons, get_blame, Blamed, get_collaborators
+from ..utils import embeds, buttons, get_blame, Blamed, get_collaborators, \
+    ledger
 from .. import soundcloud, state, config
 
 class Update(TypedDict):
@@ -38,12 +39,52 @@ class Wip(TypedDict):
 
     track: soundcloud.Track | None = None
 
+    # sha256 of the audio we uploaded as track, if we uploaded it
+    track_hash: str | None = None
+
     # most recent update (if it exists)
     update: Update | None = None
 
     # timestamp
     timestamp: Annotated[datetime, disnake.utils.utcnow]
 
+    def __setattr__(self, name, value):
+        # a different track means a hash for the old one is meaningless
+        if name == "track" and value is not self.__dict__.get("track"):
+            self.__dict__["track_hash"] = None
+        super().__setattr__(name, value)
+
+    # everything the embeds are rendered from. it's worked out fresh every
+    # time, so rendered embeds go stale on any change to these, including
+    # in-place ones like editing the credit lists
+    @property
+    def version(self) -> tuple:
+        update = self.update
+        return (self.name, self.progress, self.timestamp,
+                tuple(user.id for user in self.credit.vocalists),
+                tuple(user.id for user in self.credit.producers),
+                self.track.url if self.track else None,
+                (update.message.id, update.timestamp) if update else None)
+
+    # caches an embed variant until the next version bump. callers get the
+    # cached object, so copy() it before changing anything
+    def _render(self, variant: str, render) -> disnake.Embed:
+        rendered = self.__dict__.setdefault("_rendered", {})
+        if (cached := rendered.get(variant)) and cached[0] == self.version:
+            return cached[1]
+        embed = render()
+        rendered[variant] = (self.version, embed)
+        return embed
+
+    # tracks which version each of our messages was last rendered at, so we
+    # only edit them when something has actually changed
+    def stale(self, message: str) -> bool:
+        synced = self.__dict__.setdefault("_synced", {})
+        return synced.get(message) != self.version
+
+    def mark_synced(self, message: str):
+        self.__dict__.setdefault("_synced", {})[message] = self.version
+
     @without("guild")
     async def without_guild(self):
         raise TypeError("Guild not provided in WIP. Maybe I got kicked?")
@@ -70,6 +111,7 @@ class Wip(TypedDict):
 
         # deletes role
         if self.role:
+            ledger.expect(disnake.AuditLogAction.role_delete, self.role.id)
             await self.role.delete()
 
         embed = embeds.error(
@@ -125,12 +167,29 @@ class Wip(TypedDict):
     async def update_pinned(self):
         if self.pinned is None:
             self.pinned = await self.channel.send(embed=self.pinned_embed())
-        else:
+        elif self.stale("pinned"):
             await self.pinned.edit(embed=self.pinned_embed())
+        self.mark_synced("pinned")
 
         if not self.pinned.pinned:
             await self.pinned.pin()
 
+    # put the channel name, role name and pinned message back to what they
+    # should be, only touching the ones that have drifted. edit() leaves the
+    # role alone, same as it always has
+    async def reconcile(self, role: bool = True):
+        channel_name = self._get_channel_name(self.name, self.progress)
+        if self.channel.name != channel_name:
+            ledger.expect(
+                disnake.AuditLogAction.channel_update, self.channel.id)
+            await self.channel.edit(name=channel_name)
+
+        if role and self.role.name != self.name:
+            ledger.expect(disnake.AuditLogAction.role_update, self.role.id)
+            await self.role.edit(name=self.name)
+
+        await self.update_pinned()
+
     @staticmethod
     def _get_channel_name(name: str, progress: int):
         s = [
@@ -198,7 +257,7 @@ class Wip(TypedDict):
         progress = cls._validate_progress(progress)
 
         if existing_channel:
-            if disnake.utils.get(state().wips, channel=existing_channel):
+            if state().wip(existing_channel.id):
                 raise UserError("This channel is already a WIP.")
 
         # get WIPs category
@@ -216,10 +275,6 @@ class Wip(TypedDict):
         members = set(extra_members if extra_members else [])
 
         if existing_channel:
-            # keep sketches from simultaneously being WIPs
-            state().sketches = [
-                s for s in state().sketches if s.channel != existing_channel]
-
             # add anyone who has sent an audio file
             members.update(await get_collaborators(existing_channel))
 
@@ -245,6 +300,8 @@ class Wip(TypedDict):
         }
 
         if existing_channel:
+            ledger.expect(
+                disnake.AuditLogAction.channel_update, existing_channel.id)
             await existing_channel.edit(**kwargs)
             channel = existing_channel
         else:
@@ -267,41 +324,47 @@ class Wip(TypedDict):
             guild=guild,
             channel=channel,
             role=new_role)
-        state().wips.append(wip)
-        await state().save()
+
+        async with state().transaction():
+            # keep sketches from simultaneously being WIPs
+            if (sketch := state().sketch(channel.id)):
+                await state().remove_sketch(sketch)
+            await state().add_wip(wip)
 
         return wip
 
     def view_embed(self):
-        return self.as_embed(
+        return self._render("view", lambda: self.as_embed(
             title_prefix="",
             include_links=True,
             use_update_timestamp=True,
-            show_help=False)
+            show_help=False))
 
     def update_embed(self):
-        return self.as_embed(
+        return self._render("update", lambda: self.as_embed(
             title_prefix="\N{BELL}",
             include_links=False,
             use_update_timestamp=False,
-            show_help=False)
+            show_help=False))
 
     def pinned_embed(self):
-        return self.as_embed(
+        return self._render("pinned", lambda: self.as_embed(
             title_prefix="\N{PUSHPIN}",
             include_links=True,
             use_update_timestamp=True,
-            show_help=True)
+            show_help=True))
 
     def archive_embed(self):
-        embed = self.as_embed(
-            title_prefix="\N{OPEN FILE FOLDER}",
-            include_links=True,
-            use_update_timestamp=True,
-            show_help=False)
-        embed.color = disnake.Color.yellow()
-        embed.description = "This WIP has been archived."
-        return embed
+        def render():
+            embed = self.as_embed(
+                title_prefix="\N{OPEN FILE FOLDER}",
+                include_links=True,
+                use_update_timestamp=True,
+                show_help=False)
+            embed.color = disnake.Color.yellow()
+            embed.description = "This WIP has been archived."
+            return embed
+        return self._render("archive", render)
 
     def as_embed(self, *,
                  title_prefix: str,
@@ -401,15 +464,15 @@ class Wip(TypedDict):
         if self.track:
             self.raise_on_unlinked_members()
 
-        self.name = name or self.name
-        self.progress = progress or self.progress
-
-        new_name = self._get_channel_name(self.name, self.progress)
-        if self.channel.name != new_name:
-            await self.channel.edit(name=new_name)
+        if name is not None:
+            self.name = name
+        if progress is not None:
+            self.progress = progress
+        await state().update_wip(self)
 
-        if self.update:
+        if self.update and self.stale("update"):
             await self.update.message.edit(embed=self.update_embed())
+            self.mark_synced("update")
 
         if self.track:
             try:
@@ -428,4 +491,4 @@ class Wip(TypedDict):
                 else:
                     raise e
 
-        await self.update_pinned()
+        await self.reconcile(role=False)
@@ -7,7 +7,7 @@ from typing import TYPE_CHECKING
 # global state/configuration at runtime by proxying through these classes.
 
 if TYPE_CHECKING:
-    from .datatypes import State, Config, Tokens
+    from .datatypes import State, Config, Tokens, Jobs
 
 def state() -> 'State':
     from .datatypes import State
@@ -20,3 +20,7 @@ def config() -> 'Config':
 def tokens() -> 'Tokens':
     from .datatypes import Tokens
     return Tokens()
+
+def jobs() -> 'Jobs':
+    from .datatypes import Jobs
+    return Jobs()
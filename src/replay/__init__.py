@@ -0,0 +1,10 @@
+from .recorder import Recorder, RECORDED_EVENTS
+from .harness import replay, read_trace, Report
+
+__all__ = [
+    "Recorder",
+    "RECORDED_EVENTS",
+    "replay",
+    "read_trace",
+    "Report"
+]
@@ -0,0 +1,28 @@
+import argparse
+import asyncio
+
+from .harness import replay, read_trace
+
+# python -m src.replay trace.jsonl --state state.json --config config.json
+def main():
+    parser = argparse.ArgumentParser(
+        description="Replay a recorded gateway trace against stubbed APIs.")
+    parser.add_argument("trace")
+    parser.add_argument("--state", default="state.json")
+    parser.add_argument("--config", default="config.json")
+    parser.add_argument("--speed", type=float, default=0,
+                        help="how much faster than recorded (0: no waiting)")
+    parser.add_argument("--settle", type=float, default=5,
+                        help="seconds to wait for work after the last event")
+    args = parser.parse_args()
+
+    report = asyncio.run(replay(
+        read_trace(args.trace),
+        state_file=args.state,
+        config_file=args.config,
+        speed=args.speed,
+        settle=args.settle))
+    print(report.format())
+
+if __name__ == "__main__":
+    main()
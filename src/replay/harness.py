@@ -0,0 +1,227 @@
+import disnake
+from disnake.ext import commands
+from disnake.webhook.async_ import async_context
+
+import asyncio
+import json
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from ..datatypes import State, Config, Tokens, Jobs, UpdateHistory
+from .. import validator, soundcloud, cogs, utils
+from ..validator.json_file import JsonFileMeta
+from .stubs import StubDiscord, StubWebhookAdapter, StubSoundCloud
+
+HEADER_EVENTS = ("READY", "GUILD_CREATE")
+
+@dataclass
+class Report:
+    events: Counter[str] = field(default_factory=Counter)
+    timings: defaultdict[str, list[float]] = field(
+        default_factory=lambda: defaultdict(list))
+    errors: Counter[str] = field(default_factory=Counter)
+    discord_calls: Counter[str] = field(default_factory=Counter)
+    soundcloud_calls: Counter[str] = field(default_factory=Counter)
+    elapsed: float = 0
+
+    def format(self) -> str:
+        lines = [f"replayed {sum(self.events.values())} events "
+                 f"in {self.elapsed:.2f}s"]
+        for event, count in self.events.most_common():
+            lines.append(f"  {count:>6}  {event}")
+
+        width = max(map(len, self.timings), default=0)
+        lines.append(f"\n  {'handler latency (ms)':<{width}}"
+                     f"  calls    mean     p95     max")
+        for handler, times in sorted(self.timings.items()):
+            ms = sorted(t * 1000 for t in times)
+            p95 = ms[min(len(ms) - 1, int(len(ms) * 0.95))]
+            lines.append(f"  {handler:<{width}} {len(ms):>6} "
+                         f"{statistics.fmean(ms):>7.2f} "
+                         f"{p95:>7.2f} {ms[-1]:>7.2f}")
+
+        for title, calls in (("discord api calls", self.discord_calls),
+                             ("soundcloud api calls", self.soundcloud_calls)):
+            lines.append(f"\n{title}: {sum(calls.values())}")
+            for route, count in calls.most_common():
+                lines.append(f"  {count:>6}  {route}")
+
+        if self.errors:
+            lines.append(f"\nerrors: {sum(self.errors.values())}")
+            for event, count in self.errors.most_common():
+                lines.append(f"  {count:>6}  {event}")
+
+        return "\n".join(lines)
+
+
+class ReplayBot(commands.InteractionBot):
+    def __init__(self, report: Report, **kwargs):
+        super().__init__(**kwargs)
+        self.report = report
+
+    async def _run_event(self, coro, event_name, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            await super()._run_event(coro, event_name, *args, **kwargs)
+        finally:
+            name = getattr(coro, "__qualname__", event_name)
+            self.report.timings[name].append(time.perf_counter() - start)
+
+    async def on_error(self, event_method: str, *args, **kwargs):
+        self.report.errors[event_method] += 1
+        _, e, _ = sys.exc_info()
+        print(f"{event_method}: {e!r}")
+
+
+# never touches the network: the session is stubbed, and refresh() would
+# otherwise go scraping soundcloud.com for a client id
+class OfflineClient(soundcloud.Client):
+    async def refresh(self):
+        self.client_id = "replay"
+        self.me = soundcloud.User(self, **self.http.me)
+
+
+# everything a replay leaves behind that would otherwise leak into the next
+# one (or keep running after it): the cogs and their loops and workers, any
+# handlers still going, and the singletons/caches that live at module level
+async def teardown(bot: commands.InteractionBot):
+    for name in list(bot.cogs):
+        bot.remove_cog(name)
+
+    pending = [t for t in asyncio.all_tasks()
+               if t.get_name().startswith("disnake: ") and not t.done()]
+    for task in pending:
+        task.cancel()
+    await asyncio.gather(*pending, return_exceptions=True)
+    # let the cancelled loops and workers unwind
+    await asyncio.sleep(0)
+
+    for cls in (State, Config, Tokens, Jobs):
+        JsonFileMeta._instances.pop(cls, None)
+    validator.GuildElementByName._resolved.clear()
+
+def read_trace(path: str | Path) -> list[dict]:
+    with open(path, "r") as fp:
+        return [json.loads(line) for line in fp if line.strip()]
+
+# feeds a recorded trace through the real cogs, against stubbed discord and
+# soundcloud apis. speed scales the gaps between events (0 means don't wait
+# at all), and settle is how long to let debounced/looping work finish
+# after the last event.
+async def replay(trace: list[dict], *,
+                 state_file: str | Path,
+                 config_file: str | Path,
+                 speed: float = 0,
+                 settle: float = 5) -> Report:
+    report = Report()
+
+    intents = disnake.Intents.default()
+    intents.members = True
+    intents.message_content = True
+    bot = ReplayBot(report, intents=intents)
+    connection = bot._connection
+
+    discord = StubDiscord()
+    bot.http.request = discord.request
+    bot.http.get_from_cdn = discord.get_from_cdn
+    async_context.set(StubWebhookAdapter(discord))
+
+    sc = OfflineClient("replay")
+    await sc.http.close()
+    sc.http = StubSoundCloud()
+    await sc.refresh()
+
+    def apply(event: str, data: dict):
+        discord.observe(event, data)
+        report.events[event] += 1
+
+        if event == "READY":
+            connection.user = disnake.ClientUser(
+                state=connection, data=data["user"])
+            connection._users[connection.user.id] = connection.user
+            if (application := data.get("application")):
+                connection.application_id = int(application["id"])
+        elif event == "GUILD_CREATE":
+            connection._add_guild_from_data(data)
+        elif (parse := connection.parsers.get(event)):
+            try:
+                parse(data)
+            except Exception as e:
+                report.errors[f"parse {event}"] += 1
+                print(f"parse {event}: {e!r}")
+
+    # the bot user and guild have to exist before state can load
+    events = iter(trace)
+    rest = []
+    for line in events:
+        if line["t"] not in HEADER_EVENTS:
+            rest = [line, *events]
+            break
+        apply(line["t"], line["d"])
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # work on copies, since saving state is part of what gets replayed
+        tmp = Path(tmp)
+        shutil.copy(state_file, tmp / "state.json")
+        shutil.copy(config_file, tmp / "config.json")
+        with open(tmp / "tokens.json", "w") as fp:
+            json.dump({"discord": "replay", "soundcloud": "replay"}, fp)
+
+        registrar = validator.Registrar(
+            *validator.base_serializers(),
+            *validator.disnake_serializers(bot),
+            *soundcloud.serializers(sc)
+        )
+        try:
+            await asyncio.gather(
+                State.load(tmp / "state.json", tmp / "backups", registrar),
+                Config.load(tmp / "config.json", tmp / "backups", registrar),
+                Tokens.load(tmp / "tokens.json", tmp / "backups", registrar),
+                Jobs.load(tmp / "jobs.json", tmp / "backups", registrar))
+
+            router = utils.MessageRouter()
+            components = utils.ComponentRouter()
+            bot.add_listener(components.on_button_click, "on_button_click")
+            audio = utils.AudioCache(
+                tmp / "audio", sc.http,
+                Config().audio_cache_megabytes * 1000 * 1000)
+
+            history = UpdateHistory(tmp / "history", registrar)
+
+            cogs.add_cogs(bot, sc=sc, router=router, components=components,
+                          audio=audio, history=history)
+            bot.add_listener(router.on_message, "on_message")
+            bot._handle_ready()
+
+            start = time.perf_counter()
+            last_at = rest[0]["at"] if rest else 0
+            for line in rest:
+                # traces can span restarts, where the clock starts over
+                gap = max(0, line["at"] - last_at)
+                last_at = line["at"]
+                if speed and gap:
+                    await asyncio.sleep(gap / speed)
+                apply(line["t"], line["d"])
+
+                # let the handlers get scheduled before the next event
+                await asyncio.sleep(0)
+
+            await asyncio.sleep(settle)
+            pending = [t for t in asyncio.all_tasks()
+                       if t.get_name().startswith("disnake: ") and not t.done()]
+            if pending:
+                await asyncio.wait(pending, timeout=settle)
+            report.elapsed = time.perf_counter() - start
+        finally:
+            await teardown(bot)
+
+    report.discord_calls = discord.calls
+    report.soundcloud_calls = sc.http.calls
+    return report
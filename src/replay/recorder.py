@@ -0,0 +1,86 @@
+import disnake
+import json
+import time
+
+from pathlib import Path
+
+# gateway events our cogs consume, plus READY and GUILD_CREATE so a replay
+# can rebuild the bot user and the guild before anything else happens
+RECORDED_EVENTS = {
+    "READY",
+    "GUILD_CREATE",
+    "MESSAGE_CREATE",
+    "MESSAGE_UPDATE",
+    "MESSAGE_DELETE",
+    "MESSAGE_DELETE_BULK",
+    "MESSAGE_REACTION_ADD",
+    "MESSAGE_REACTION_REMOVE",
+    "INTERACTION_CREATE",
+    "CHANNEL_CREATE",
+    "CHANNEL_UPDATE",
+    "CHANNEL_DELETE",
+    "GUILD_ROLE_CREATE",
+    "GUILD_ROLE_UPDATE",
+    "GUILD_ROLE_DELETE",
+    "GUILD_MEMBER_UPDATE",
+    "GUILD_MEMBER_REMOVE",
+    "GUILD_AUDIT_LOG_ENTRY_CREATE",
+}
+
+TEXT_INPUT = 4
+
+# interactions carry a token that can be used to respond as the bot for 15
+# minutes, and modals are where people paste things like soundcloud oauth
+# tokens. neither has any business sitting around in a trace file.
+def redact_interaction(data: dict) -> dict:
+    if "token" in data:
+        data["token"] = "redacted"
+
+    def _walk(obj):
+        if isinstance(obj, dict):
+            if obj.get("type") == TEXT_INPUT and "value" in obj:
+                obj["value"] = "redacted"
+            for value in obj.values():
+                _walk(value)
+        elif isinstance(obj, list):
+            for value in obj:
+                _walk(value)
+
+    _walk(data.get("data"))
+    return data
+
+# appends raw gateway payloads to a jsonl trace, one
+# {"t": event, "at": seconds since start, "d": data} per line.
+# needs the bot to be created with enable_debug_events=True.
+class Recorder:
+    def __init__(self, bot: disnake.Client, path: str | Path):
+        self.fp = open(path, "a")
+        self.start = time.monotonic()
+        self.recorded = 0
+        bot.add_listener(self.on_socket_raw_receive, "on_socket_raw_receive")
+
+    async def on_socket_raw_receive(self, raw: str):
+        payload = json.loads(raw)
+        event = payload.get("t")
+        if event not in RECORDED_EVENTS:
+            return
+
+        data = payload["d"]
+        if event == "READY":
+            # the rest is session info and a guild list we get again from
+            # GUILD_CREATE
+            data = {"user": data["user"],
+                    "application": data.get("application")}
+            self.start = time.monotonic()
+        elif event == "INTERACTION_CREATE":
+            data = redact_interaction(data)
+
+        line = {"t": event,
+                "at": round(time.monotonic() - self.start, 3),
+                "d": data}
+        self.fp.write(json.dumps(line, separators=(",", ":")) + "\n")
+        self.fp.flush()
+        self.recorded += 1
+
+    async def close(self):
+        self.fp.close()
@@ -0,0 +1,392 @@
+import disnake
+import aiohttp
+import itertools
+import re
+
+from collections import Counter
+from multidict import CIMultiDict, CIMultiDictProxy
+from typing import Any, Callable, Optional
+from urllib.parse import urlparse
+from yarl import URL
+
+from disnake.http import Route
+from disnake.webhook.async_ import AsyncWebhookAdapter
+
+from ..soundcloud.route import Route as ScRoute
+
+Params = dict[str, str]
+
+# stands in for disnake's HTTPClient.request. every call is counted by route,
+# and the handful of routes whose response the bot actually looks at get a
+# plausible payload back, built from what the trace has shown us so far.
+class StubDiscord:
+    def __init__(self):
+        self.calls: Counter[str] = Counter()
+        self.user: Optional[dict] = None
+
+        self.messages: dict[int, dict] = {}
+        self.roles: dict[int, dict] = {}
+        self.channels: dict[int, dict] = {}
+        self.interaction_channels: dict[str, str] = {}
+        self._ids = itertools.count()
+
+        self.responders: dict[tuple[str, str], Callable[[Params, Any], Any]] = {
+            ("POST", "/channels/{channel_id}/messages"): self._send,
+            ("GET", "/channels/{channel_id}/messages/{message_id}"):
+                self._get_message,
+            ("PATCH", "/channels/{channel_id}/messages/{message_id}"):
+                self._edit_message,
+            ("PATCH", "/channels/{channel_id}"): self._edit_channel,
+            ("POST", "/guilds/{guild_id}/channels"): self._create_channel,
+            ("POST", "/guilds/{guild_id}/roles"): self._create_role,
+            ("PATCH", "/guilds/{guild_id}/roles/{role_id}"): self._edit_role,
+            ("GET", "/guilds/{guild_id}/audit-logs"): self._audit_log,
+            ("GET", "/users/{user_id}"): self._get_user,
+            ("GET", "/guilds/{guild_id}/members/{user_id}"): self._get_member,
+            ("POST", "/webhooks/{webhook_id}/{webhook_token}"): self._followup,
+            ("PATCH",
+             "/webhooks/{webhook_id}/{webhook_token}/messages/{message_id}"):
+                self._followup,
+        }
+
+    def snowflake(self) -> int:
+        return disnake.utils.time_snowflake(disnake.utils.utcnow()) \
+            + next(self._ids)
+
+    # keep track of the objects the trace mentions, so lookups of them
+    # return something that matches
+    def observe(self, event: str, data: dict):
+        if event == "READY":
+            self.user = data["user"]
+        elif event == "GUILD_CREATE":
+            self.roles.update((int(r["id"]), r) for r in data.get("roles", []))
+            self.channels.update(
+                (int(c["id"]), c) for c in data.get("channels", []))
+        elif event in ("MESSAGE_CREATE", "MESSAGE_UPDATE"):
+            self.messages.setdefault(int(data["id"]), {}).update(data)
+        elif event in ("GUILD_ROLE_CREATE", "GUILD_ROLE_UPDATE"):
+            self.roles[int(data["role"]["id"])] = data["role"]
+        elif event in ("CHANNEL_CREATE", "CHANNEL_UPDATE"):
+            self.channels[int(data["id"])] = data
+        elif event == "INTERACTION_CREATE":
+            self.interaction_channels[data["token"]] = data.get("channel_id")
+
+    @staticmethod
+    def _params(route: Route) -> Params:
+        pattern = re.sub(r"\\\{(\w+)\\\}", r"(?P<\1>[^/]+)",
+                         re.escape(route.path))
+        path = route.url[len(Route.BASE):].split("?")[0]
+        match = re.fullmatch(pattern, path)
+        return match.groupdict() if match else {}
+
+    # attachment downloads skip request() and go straight to the cdn
+    async def get_from_cdn(self, url: str) -> bytes:
+        self.calls["GET cdn"] += 1
+        return b""
+
+    async def request(self, route: Route, *, files=None, form=None, **kwargs):
+        self.calls[f"{route.method} {route.path}"] += 1
+        responder = self.responders.get((route.method, route.path))
+        if responder is None:
+            return None
+        return responder(self._params(route), kwargs.get("json"))
+
+    def _message(self, channel_id: str, data: Optional[dict] = None,
+                 message_id: Optional[int] = None) -> dict:
+        data = data or {}
+        return {
+            "id": str(message_id or self.snowflake()),
+            "channel_id": str(channel_id),
+            "author": self.user,
+            "content": data.get("content") or "",
+            "embeds": data.get("embeds") or [],
+            "components": data.get("components") or [],
+            "attachments": [],
+            "timestamp": disnake.utils.utcnow().isoformat(),
+            "edited_timestamp": None,
+            "tts": False,
+            "mention_everyone": False,
+            "mentions": [],
+            "mention_roles": [],
+            "pinned": False,
+            "type": 0,
+            "flags": 0,
+        }
+
+    def _send(self, params: Params, json: Any):
+        message = self._message(params["channel_id"], json)
+        self.messages[int(message["id"])] = message
+        return message
+
+    def _get_message(self, params: Params, _):
+        message_id = int(params["message_id"])
+        if message_id not in self.messages:
+            self.messages[message_id] = self._message(
+                params["channel_id"], message_id=message_id)
+        return self.messages[message_id]
+
+    def _edit_message(self, params: Params, json: Any):
+        message = self._get_message(params, None)
+        message.update({k: v for k, v in (json or {}).items()
+                        if k in ("content", "embeds", "components")})
+        return message
+
+    def _edit_channel(self, params: Params, json: Any):
+        channel = self.channels.get(int(params["channel_id"]))
+        if channel is None:
+            return None
+        channel.update(json or {})
+        return channel
+
+    def _create_channel(self, params: Params, json: Any):
+        json = json or {}
+        channel = {
+            "id": str(self.snowflake()),
+            "type": json.get("type", 0),
+            "guild_id": params["guild_id"],
+            "name": json.get("name", "channel"),
+            "position": json.get("position") or 0,
+            "permission_overwrites": json.get("permission_overwrites", []),
+            "parent_id": json.get("parent_id"),
+            "topic": json.get("topic"),
+            "nsfw": False,
+        }
+        self.channels[int(channel["id"])] = channel
+        return channel
+
+    def _create_role(self, params: Params, json: Any):
+        role = {
+            "id": str(self.snowflake()),
+            "name": "new role",
+            "permissions": "0",
+            "position": 1,
+            "color": 0,
+            "colors": {"primary_color": 0, "secondary_color": None,
+                       "tertiary_color": None},
+            "hoist": False,
+            "managed": False,
+            "mentionable": False,
+            "flags": 0,
+        }
+        role.update(json or {})
+        self.roles[int(role["id"])] = role
+        return role
+
+    def _edit_role(self, params: Params, json: Any):
+        role_id = int(params["role_id"])
+        if role_id not in self.roles:
+            role = self._create_role(params, None)
+            del self.roles[int(role["id"])]
+            self.roles[role_id] = role | {"id": str(role_id)}
+        self.roles[role_id].update(json or {})
+        return self.roles[role_id]
+
+    def _audit_log(self, *_):
+        return {
+            "audit_log_entries": [],
+            "users": [],
+            "integrations": [],
+            "webhooks": [],
+            "threads": [],
+            "application_commands": [],
+            "auto_moderation_rules": [],
+            "guild_scheduled_events": [],
+        }
+
+    def _get_user(self, params: Params, _):
+        return {
+            "id": params["user_id"],
+            "username": f"user{params['user_id']}",
+            "discriminator": "0",
+            "global_name": None,
+            "avatar": None,
+        }
+
+    def _get_member(self, params: Params, _):
+        return {
+            "user": self._get_user(params, None),
+            "roles": [],
+            "joined_at": disnake.utils.utcnow().isoformat(),
+            "deaf": False,
+            "mute": False,
+        }
+
+    def _followup(self, params: Params, json: Any):
+        channel_id = self.interaction_channels.get(params["webhook_token"])
+        return self._message(channel_id or "0", json)
+
+# interaction responses and followups go through webhooks instead of the
+# HTTPClient, so those need stubbing separately
+class StubWebhookAdapter(AsyncWebhookAdapter):
+    def __init__(self, stub: StubDiscord):
+        super().__init__()
+        self.stub = stub
+
+    async def request(self, route: Route, session, *,
+                      payload: Optional[dict] = None, **_):
+        return await self.stub.request(route, json=payload)
+
+
+# every download is the same (tiny) mp3
+AUDIO = b"ID3\x04\x00\x00\x00\x00\x00\x00"
+
+class StubStream:
+    def __init__(self):
+        self.data = AUDIO
+
+    async def read(self, n: int = -1) -> bytes:
+        chunk = self.data if n < 0 else self.data[:n]
+        self.data = self.data[len(chunk):]
+        return chunk
+
+    async def iter_chunked(self, n: int):
+        while (chunk := await self.read(n)):
+            yield chunk
+
+
+class StubResponse:
+    def __init__(self, method: str, url: str, status: int = 200,
+                 body: Any = None):
+        self.method = method
+        self.url = url
+        self.status = status
+        self.ok = status < 400
+        self.headers = {"Content-Length": "0"}
+        self.content = StubStream()
+        self._body = {} if body is None else body
+
+    async def json(self):
+        return self._body
+
+    async def read(self) -> bytes:
+        return b""
+
+    def raise_for_status(self):
+        if self.ok:
+            return
+        request_info = aiohttp.RequestInfo(
+            URL(self.url), self.method,
+            CIMultiDictProxy(CIMultiDict()), URL(self.url))
+        raise aiohttp.ClientResponseError(
+            request_info, (), status=self.status)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *_):
+        pass
+
+# stands in for the soundcloud client's aiohttp session. same idea as
+# StubDiscord: count everything, answer what the bot reads.
+class StubSoundCloud:
+    def __init__(self):
+        self.calls: Counter[str] = Counter()
+        self._ids = itertools.count(1000)
+        self.me = self._user(1)
+
+        # new tracks show up as still transcoding the first time they're
+        # fetched, so the code waiting on that gets exercised
+        self.processing: set[int] = set()
+
+        self.responders: list[tuple[str, str, Callable[..., Any]]] = [
+            ("GET", r"/me", lambda: self.me),
+            ("GET", r"/users/soundcloud:users:(\d+)",
+             lambda s_id: self._user(int(s_id))),
+            ("GET", r"/users/\d+/playlists_without_albums",
+             lambda: {"collection": [self._playlist(1, "wips")],
+                      "next_href": None}),
+            ("GET", r"/tracks/soundcloud:tracks:(\d+)",
+             lambda s_id: self._track(int(s_id))),
+            ("PUT", r"/tracks/soundcloud:tracks:(\d+)",
+             lambda s_id: self._track(int(s_id))),
+            ("GET", r"/playlists/(\d+)",
+             lambda s_id: self._playlist(int(s_id), "playlist")),
+            ("POST", r"/uploads/track-upload-policy", self._upload_policy),
+            ("GET", r"/track_permalink_availability",
+             lambda: {"track_permalink_available": True}),
+            ("POST", r"/tracks", self._create_track),
+            ("GET", r"/tracks", lambda: []),
+        ]
+
+    def _user(self, s_id: int) -> dict:
+        return {
+            "id": s_id,
+            "permalink_url": f"https://soundcloud.com/user{s_id}",
+            "permalink": f"user{s_id}",
+            "avatar_url": "",
+            "username": f"user{s_id}",
+            "badges": {"pro": False, "pro_unlimited": False},
+        }
+
+    def _create_track(self):
+        s_id = next(self._ids)
+        self.processing.add(s_id)
+        return {"id": s_id, "secret_token": "s-replay"}
+
+    def _track(self, s_id: int) -> dict:
+        state = "finished"
+        if s_id in self.processing:
+            self.processing.discard(s_id)
+            state = "processing"
+
+        return {
+            "id": s_id,
+            "permalink_url": f"https://soundcloud.com/user1/track{s_id}",
+            "permalink": f"track{s_id}",
+            "title": f"track{s_id}",
+            "description": "",
+            "artwork_url": None,
+            "secret_token": "s-replay",
+            "user": self.me,
+            "tag_list": "wip",
+            "state": state,
+        }
+
+    def _playlist(self, s_id: int, title: str) -> dict:
+        return {
+            "id": s_id,
+            "permalink_url": f"https://soundcloud.com/user1/sets/{title}",
+            "permalink": title,
+            "title": title,
+            "description": "",
+            "artwork_url": None,
+            "secret_token": None,
+            "user": self.me,
+            "tracks": [],
+        }
+
+    def _upload_policy(self):
+        uid = str(next(self._ids))
+        return {"uid": uid, "url": f"https://uploads.replay/{uid}",
+                "headers": {}}
+
+    def request(self, method: str, url: str, **_) -> StubResponse:
+        method = method.upper()
+        parsed = urlparse(url)
+        path = re.sub(r"(?<=[/:])[0-9]+(?=/|$)", "{id}", parsed.path)
+        self.calls[f"{method} {parsed.netloc}{path}"] += 1
+
+        # everything that isn't the api (attachment downloads, the upload
+        # policy's bucket) just succeeds
+        if parsed.netloc != urlparse(ScRoute.BASE_URL).netloc:
+            return StubResponse(method, url)
+
+        for verb, pattern, respond in self.responders:
+            if verb == method and (match := re.fullmatch(pattern, parsed.path)):
+                return StubResponse(method, url, body=respond(*match.groups()))
+
+        if method in ("PUT", "POST", "DELETE"):
+            return StubResponse(method, url)
+        return StubResponse(method, url, status=404)
+
+    def get(self, url: str, **kwargs) -> StubResponse:
+        return self.request("GET", url, **kwargs)
+
+    def put(self, url: str, **kwargs) -> StubResponse:
+        return self.request("PUT", url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> StubResponse:
+        return self.request("POST", url, **kwargs)
+
+    async def close(self):
+        pass
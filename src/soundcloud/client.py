@@ -1,13 +1,30 @@
-from typing import Union, Optional
-from urllib.parse import urlparse
+from typing import IO, Union, Optional, Callable, TypeAlias
 
 import asyncio
 import aiohttp
+import io
 import re
 
 from .route import routes
 from .datatypes import Track, User, Playlist, MONETIZATION_ARGS
 
+# gets called with (bytes sent, total bytes) as audio uploads
+UploadProgress: TypeAlias = Callable[[int, int], None]
+
+# handing aiohttp the file itself would let it close it once it's sent,
+# and callers might still want it afterwards
+async def _read_chunks(fp: IO[bytes], size: int = 64 * 1024,
+                       sent: Optional[Callable[[int], None]] = None):
+    while (chunk := fp.read(size)):
+        yield chunk
+        if sent:
+            sent(len(chunk))
+
+def _retryable(e: Exception) -> bool:
+    if isinstance(e, aiohttp.ClientResponseError):
+        return e.status >= 500
+    return isinstance(e, (aiohttp.ClientError, asyncio.TimeoutError))
+
 class Client:
     def __init__(self, oauth_token: str):
         self.http = aiohttp.ClientSession()
@@ -100,30 +117,79 @@ class Client:
                 return candidate
         raise RuntimeError(f"Track {title} has been uploaded {tries} times?")
 
-    async def upload_track(self, file_url: str, *,
+    # fp should be at the start of the file. it's left wherever the upload
+    # finished reading it
+    async def upload_track(self, fp: IO[bytes], *,
+                           filename: str,
                            title: str,
                            description: str,
                            tags: str) -> Track:
-        async with self.http.get(file_url) as file_resp:
-            file_resp.raise_for_status()
-
-            filename = urlparse(file_url).path.split("/")[-1]
-            filesize = int(file_resp.headers["Content-Length"])
-
-            # get track policy
+        uid = await self.upload_audio(fp, filename=filename)
+        return await self.publish_track(uid,
+                                        filename=filename,
+                                        title=title,
+                                        description=description,
+                                        tags=tags)
+
+    # the two halves of upload_track. the audio goes up (and starts
+    # transcoding) first, and only turns into a track once it's published,
+    # so anything that should happen before the track exists (like deleting
+    # the one it replaces) can run in between. returns the upload's uid.
+    #
+    # fp has to be seekable: a transfer that fails partway (or takes longer
+    # than timeout seconds) starts over from fp, up to `retries` more times.
+    # the upload url can't pick up where a failed transfer left off.
+    async def upload_audio(self, fp: IO[bytes], *,
+                           filename: str,
+                           progress: Optional[UploadProgress] = None,
+                           timeout: float = 600,
+                           retries: int = 3) -> str:
+        start = fp.tell()
+        filesize = fp.seek(0, io.SEEK_END) - start
+
+        for attempt in range(retries + 1):
+            fp.seek(start)
+            sent = 0
+
+            def count(n: int):
+                nonlocal sent
+                sent += n
+                if progress:
+                    progress(sent, filesize)
+
+            # get track policy (a fresh one each time, in case the last
+            # one's expired)
             policy = await self.routes["track_upload_policy"].run(
                 filename=filename, filesize=filesize)
             uid = policy["uid"]
 
             # upload track to policy
-            async with self.http.put(policy["url"],
-                                     headers=policy["headers"],
-                                     data=file_resp.content) as policy_resp:
-                policy_resp.raise_for_status()
+            headers = {**policy["headers"], "Content-Length": str(filesize)}
+            try:
+                async with self.http.put(
+                        policy["url"],
+                        headers=headers,
+                        data=_read_chunks(fp, sent=count),
+                        timeout=aiohttp.ClientTimeout(total=timeout)
+                ) as policy_resp:
+                    policy_resp.raise_for_status()
+                break
+            except Exception as e:
+                if attempt == retries or not _retryable(e):
+                    raise e
+                print(f"Upload of {filename} failed after {sent} of "
+                      f"{filesize} bytes ({e!r}), retrying")
+                await asyncio.sleep(2 ** attempt)
 
         # queue track transcoding
         await self.routes["track_transcoding"].run(uid=uid)
+        return uid
 
+    async def publish_track(self, uid: str, *,
+                            filename: str,
+                            title: str,
+                            description: str,
+                            tags: str) -> Track:
         # find a slug
         permalink = await self.find_permalink(title)
 
@@ -141,6 +207,27 @@ class Client:
         # re-fetch, since not all info is available
         return await self.fetch_track(result["id"], result["secret_token"])
 
+    # polls a freshly uploaded track until soundcloud's done transcoding it,
+    # backing off between checks. returns the finished track, or None if
+    # transcoding failed or didn't finish within timeout seconds
+    async def wait_for_transcoding(self, track: Track, *,
+                                   timeout: float = 600,
+                                   interval: float = 2,
+                                   max_interval: float = 30) -> Optional[Track]:
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+
+        while track.state == "processing":
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                return None
+
+            await asyncio.sleep(min(interval, remaining))
+            interval = min(interval * 2, max_interval)
+            track = await self.fetch_track(track.s_id, track.secret_token)
+
+        return track if track.playable else None
+
     async def fetch_track(
             self, s_id: int, secret_token: Optional[str] = None) -> Track:
         return await self.routes["fetch_track"].run(
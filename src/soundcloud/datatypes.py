@@ -95,10 +95,19 @@ class User(ScObject):
             offset += 10
 
 class Track(TrackOrPlaylist):
-    def __init__(self, *args, tag_list: str, **kwargs):
+    def __init__(self, *args, tag_list: str, state: str = "finished",
+                 **kwargs):
         super().__init__(*args, **kwargs)
         self.tags = tag_list
 
+        # "processing" while freshly uploaded audio is still transcoding,
+        # then "finished" (or "failed")
+        self.state = state
+
+    @property
+    def playable(self):
+        return self.state == "finished"
+
     async def edit(self,
                    title: Optional[str] = None,
                    description: Optional[str] = None,
@@ -1,6 +1,19 @@
 from .errors import UserError, send_error, error_handler
-from .misc import send_modal, get_audio_attachment, get_blame, Blamed, get_collaborators
+from .misc import send_modal, get_audio_attachment, get_blame, Blamed, \
+    get_collaborators, MessageRef, jump_url
 from .embeds import WUCK
+from .membership import membership
+from .audit_log import audit_log
+from .ledger import ledger
+from .router import MessageRouter, MessageKind
+from .components import ComponentRouter, optional_str
+from .debounce import Debouncer
+from .lru import LRUCache
+from .readiness import ReadinessGate
+from .locks import KeyedLock
+from .audio_cache import AudioCache
+from .progress import ProgressReporter
+from .probe import probe_audio, sniff_audio
 
 __all__ = [
     "buttons",
@@ -13,5 +26,22 @@ __all__ = [
     "get_blame",
     "get_collaborators",
     "Blamed",
-    "WUCK"
+    "WUCK",
+    "membership",
+    "audit_log",
+    "ledger",
+    "MessageRouter",
+    "MessageKind",
+    "ComponentRouter",
+    "optional_str",
+    "Debouncer",
+    "LRUCache",
+    "ReadinessGate",
+    "KeyedLock",
+    "AudioCache",
+    "ProgressReporter",
+    "probe_audio",
+    "sniff_audio",
+    "MessageRef",
+    "jump_url"
 ]
@@ -0,0 +1,194 @@
+import disnake
+import aiohttp
+import asyncio
+import hashlib
+import json
+import os
+
+from collections import OrderedDict
+from pathlib import Path
+from tempfile import NamedTemporaryFile
+from typing import IO
+
+from .locks import KeyedLock
+
+# audio attachments saved to disk, so the same file isn't pulled from
+# discord's cdn again every time something needs it.
+#
+# files are stored by the sha256 of their contents, and attachments point at
+# those (attachments never change, but the same audio can get uploaded more
+# than once). the least recently used attachments get dropped once
+# everything adds up to more than max_bytes.
+class AudioCache:
+    INDEX = "index.json"
+
+    def __init__(self,
+                 root: str | Path,
+                 session: aiohttp.ClientSession,
+                 max_bytes: int):
+        self.root = Path(root)
+        self.session = session
+        self.max_bytes = max_bytes
+
+        # attachment id -> (sha256, size), least recently used first
+        self._index: OrderedDict[int, tuple[str, int]] = OrderedDict()
+        self._refs: dict[str, int] = {}
+        self.size = 0
+        self._locks = KeyedLock()
+
+        self.hits = 0
+        self.misses = 0
+        self.bytes_saved = 0
+
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._load()
+
+    def _path(self, digest: str) -> Path:
+        return self.root / digest
+
+    def _load(self):
+        index_path = self.root / self.INDEX
+        if index_path.exists():
+            with index_path.open("r") as fp:
+                for attachment_id, (digest, size) in json.load(fp):
+                    if self._path(digest).exists():
+                        self._add(int(attachment_id), digest, size)
+
+        # anything left over from before isn't pointed at by anything
+        for path in self.root.iterdir():
+            if path.name != self.INDEX and path.name not in self._refs:
+                path.unlink()
+
+    def _add(self, attachment_id: int, digest: str, size: int):
+        self._index[attachment_id] = (digest, size)
+        if digest not in self._refs:
+            self._refs[digest] = 0
+            self.size += size
+        self._refs[digest] += 1
+
+    def _drop(self, attachment_id: int):
+        if (entry := self._index.pop(attachment_id, None)) is None:
+            return
+        digest, size = entry
+        self._refs[digest] -= 1
+        if not self._refs[digest]:
+            del self._refs[digest]
+            self.size -= size
+
+    # returns the files that aren't needed anymore, for the caller to delete
+    def _evict(self) -> list[Path]:
+        evicted = []
+        # the newest entry stays, even if it's bigger than the whole cache
+        while self.size > self.max_bytes and len(self._index) > 1:
+            _, (digest, size) = self._index.popitem(last=False)
+            self._refs[digest] -= 1
+            if not self._refs[digest]:
+                del self._refs[digest]
+                self.size -= size
+                evicted.append(self._path(digest))
+        return evicted
+
+    # everything that touches the disk once we're up goes through a thread,
+    # so a slow disk doesn't hold up the event loop
+    def _store(self, evicted: list[Path], index: list):
+        for path in evicted:
+            path.unlink(missing_ok=True)
+        with (self.root / self.INDEX).open("w") as fp:
+            json.dump(index, fp)
+
+    async def _download(self, attachment: disnake.Attachment
+                        ) -> tuple[str, int, IO[bytes]]:
+        digest = hashlib.sha256()
+        size = 0
+
+        def write(fp: IO[bytes], chunk: bytes):
+            fp.write(chunk)
+            digest.update(chunk)
+
+        fp = await asyncio.to_thread(
+            NamedTemporaryFile, dir=self.root, delete=False)
+        try:
+            async with self.session.get(attachment.url) as resp:
+                resp.raise_for_status()
+                async for chunk in resp.content.iter_chunked(256 * 1024):
+                    await asyncio.to_thread(write, fp, chunk)
+                    size += len(chunk)
+        except BaseException:
+            await asyncio.to_thread(fp.close)
+            os.unlink(fp.name)
+            raise
+
+        # hands back the file already opened, so nothing evicted in the
+        # meantime can pull it out from under us
+        def finish() -> IO[bytes]:
+            fp.close()
+            path = self._path(digest.hexdigest())
+            try:
+                # identical audio we already have: keep the old copy
+                kept = path.open("rb")
+                os.unlink(fp.name)
+                return kept
+            except FileNotFoundError:
+                os.replace(fp.name, path)
+                return path.open("rb")
+
+        return digest.hexdigest(), size, await asyncio.to_thread(finish)
+
+    # sha256 of an attachment's audio, if it's in the cache
+    def digest(self, attachment: disnake.Attachment) -> str | None:
+        if (entry := self._index.get(attachment.id)) is not None:
+            return entry[0]
+        return None
+
+    # the first n bytes of an attachment. they come off disk if we've got
+    # the whole thing already, otherwise only that much is downloaded
+    async def head(self, attachment: disnake.Attachment, n: int) -> bytes:
+        if (digest := self.digest(attachment)) is not None:
+            def read() -> bytes:
+                with self._path(digest).open("rb") as fp:
+                    return fp.read(n)
+            try:
+                return await asyncio.to_thread(read)
+            except FileNotFoundError:
+                pass
+
+        header = b""
+        async with self.session.get(
+                attachment.url, headers={"Range": f"bytes=0-{n - 1}"}) as resp:
+            resp.raise_for_status()
+            while len(header) < n and \
+                    (chunk := await resp.content.read(n - len(header))):
+                header += chunk
+        return header
+
+    # returns the attachment's audio as an open binary file, downloading it
+    # first if it isn't here yet. the caller closes it.
+    async def open(self, attachment: disnake.Attachment) -> IO[bytes]:
+        async with self._locks(attachment.id):
+            if (entry := self._index.get(attachment.id)) is not None:
+                self._index.move_to_end(attachment.id)
+                try:
+                    fp = await asyncio.to_thread(
+                        self._path(entry[0]).open, "rb")
+                    self.hits += 1
+                    self.bytes_saved += entry[1]
+                    return fp
+                except FileNotFoundError:
+                    # evicted while we weren't looking, so fetch it again
+                    self._drop(attachment.id)
+
+            self.misses += 1
+            digest, size, fp = await self._download(attachment)
+
+            # it's already open, so it's fine if it gets unlinked from here
+            self._add(attachment.id, digest, size)
+            await asyncio.to_thread(
+                self._store, self._evict(),
+                [[k, list(v)] for k, v in self._index.items()])
+            return fp
+
+    # the same, but ready to be sent back to discord
+    async def to_file(self, attachment: disnake.Attachment) -> disnake.File:
+        return disnake.File(await self.open(attachment),
+                            filename=attachment.filename,
+                            spoiler=attachment.is_spoiler())
@@ -0,0 +1,66 @@
+import disnake
+
+from collections import deque
+from datetime import datetime, timedelta
+from typing import Optional
+
+AuditKey = tuple[disnake.AuditLogAction, int]
+
+# ring buffer of recent audit log entries, fed by the gateway's
+# on_audit_log_entry_create. get_blame checks here before paging through
+# the audit log over REST.
+class AuditLogCache:
+    def __init__(self, size: int = 256,
+                 max_age: timedelta = timedelta(seconds=60)):
+        self.max_age = max_age
+        self.entries: deque[disnake.AuditLogEntry] = deque(maxlen=size)
+        self._index: dict[AuditKey, disnake.AuditLogEntry] = {}
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _key(entry: disnake.AuditLogEntry) -> Optional[AuditKey]:
+        target_id = getattr(entry.target, "id", None)
+        if target_id is None:
+            return None
+        return entry.action, target_id
+
+    # entries from REST come newest first, so those shouldn't replace
+    # anything we already know about
+    def add(self, entry: disnake.AuditLogEntry, replace: bool = True):
+        key = self._key(entry)
+        if key is None:
+            return
+        if not replace and key in self._index:
+            return
+
+        # about to fall off the end of the buffer
+        if len(self.entries) == self.entries.maxlen:
+            oldest = self.entries[0]
+            if (old_key := self._key(oldest)) and \
+                    self._index.get(old_key) is oldest:
+                del self._index[old_key]
+
+        self.entries.append(entry)
+        self._index[key] = entry
+
+    # only trust entries from around when the event happened. an older one
+    # for the same target is about some earlier change (a rename from last
+    # week, say), so it's dropped and the caller goes to REST instead
+    def get(self, action: disnake.AuditLogAction, target_id: int,
+            at: Optional[datetime] = None) -> Optional[disnake.AuditLogEntry]:
+        key = (action, target_id)
+        entry = self._index.get(key)
+        if entry is not None:
+            at = at or disnake.utils.utcnow()
+            if abs(at - entry.created_at) > self.max_age:
+                del self._index[key]
+                entry = None
+
+        if entry is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return entry
+
+audit_log = AuditLogCache()
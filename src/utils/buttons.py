@@ -1,6 +1,7 @@
 from typing import TYPE_CHECKING
 
-from .. import soundcloud, state
+from .. import soundcloud
+from .membership import membership
 
 if TYPE_CHECKING:
     from ..datatypes import Wip
@@ -15,7 +16,7 @@ def wip_join(wip: 'Wip'):
         custom_id=f"wipjoin|{wip.channel.id}")
 
 def wip_toggle(wip: 'Wip', user: disnake.Member):
-    in_wip = wip.role in user.roles
+    in_wip = membership.in_wip(user, wip.role)
 
     if in_wip:
         return disnake.ui.Button(
@@ -30,22 +31,31 @@ def wip_toggle(wip: 'Wip', user: disnake.Member):
             style=disnake.ButtonStyle.primary,
             custom_id=f"wiptoggle|{wip.channel.id}")
 
-def wip_view_prev(index: int):
+def wip_view_prev(sort: str, cursor: tuple[int, int], disabled: bool):
+    key, channel_id = cursor
     return disnake.ui.Button(
         emoji="\N{BLACK LEFT-POINTING DOUBLE TRIANGLE}",
-        disabled=(index < 0),
+        disabled=disabled,
         style=disnake.ButtonStyle.secondary,
-        custom_id=f"wipview|{index}")
+        custom_id=f"wipview|{sort}|{key}|{channel_id}|prev")
 
-def wip_view_next(index: int):
-    num_wips = len(state().wips)
+def wip_view_next(sort: str, cursor: tuple[int, int], disabled: bool):
+    key, channel_id = cursor
     return disnake.ui.Button(
         emoji="\N{BLACK RIGHT-POINTING DOUBLE TRIANGLE}",
-        disabled=(index >= num_wips),
+        disabled=disabled,
         style=disnake.ButtonStyle.secondary,
-        custom_id=f"wipview|{index}")
+        custom_id=f"wipview|{sort}|{key}|{channel_id}|next")
 
 def track_link(track: soundcloud.Track):
+    if not track.playable:
+        return disnake.ui.Button(
+            label="Processing...",
+            emoji="\N{HOURGLASS}",
+            style=disnake.ButtonStyle.link,
+            disabled=True,
+            url=track.url)
+
     return disnake.ui.Button(
         label="SoundCloud",
         emoji="\N{SPEAKER WITH THREE SOUND WAVES}",
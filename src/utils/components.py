@@ -0,0 +1,53 @@
+import disnake
+
+from typing import Any, Awaitable, Callable
+
+from .errors import error_handler, UserError
+
+ComponentHandler = Callable[..., Awaitable[Any]]
+Parser = Callable[[str], Any]
+
+# for custom_id args that might have been formatted from a None
+def optional_str(arg: str) -> str | None:
+    return None if arg == "None" else arg
+
+# the single on_button_click listener. custom_ids look like
+# "prefix|arg|arg...". cogs register a handler for each prefix along with
+# one parser per arg, and each click goes straight to the matching handler.
+# buttons left over from an older version of the bot can have a different
+# arg layout, so a prefix can also register a legacy handler that gets the
+# raw args instead.
+class ComponentRouter:
+    def __init__(self):
+        self.handlers: dict[str, tuple[ComponentHandler, tuple[Parser, ...]]] = {}
+        self.legacy: dict[str, ComponentHandler] = {}
+
+    def register(self, prefix: str, handler: ComponentHandler,
+                 *parsers: Parser, legacy: ComponentHandler | None = None):
+        if prefix in self.handlers:
+            raise ValueError(f"{prefix} already has a component handler")
+        self.handlers[prefix] = (handler, parsers)
+        if legacy:
+            self.legacy[prefix] = legacy
+
+    @error_handler()
+    async def on_button_click(self, inter: disnake.MessageInteraction):
+        prefix, _, rest = inter.component.custom_id.partition("|")
+        if (entry := self.handlers.get(prefix)) is None:
+            return
+
+        handler, parsers = entry
+        args = rest.split("|") if rest else []
+
+        try:
+            if len(args) != len(parsers):
+                raise ValueError(f"expected {len(parsers)} args")
+            parsed = [parse(arg) for parse, arg in zip(parsers, args)]
+        except ValueError:
+            if (legacy := self.legacy.get(prefix)):
+                return await legacy(inter, *args)
+            raise UserError(
+                "This button is from an older version of the bot. "
+                "Try running the command again.")
+
+        await handler(inter, *parsed)
@@ -0,0 +1,32 @@
+import asyncio
+
+from typing import Awaitable, Callable, Hashable
+
+# runs a callback once things have been quiet for `delay` seconds.
+# rescheduling a key pushes its timer back; nothing waits on anything
+# in the meantime.
+class Debouncer:
+    def __init__(self, delay: float):
+        self.delay = delay
+        self._timers: dict[Hashable, asyncio.TimerHandle] = {}
+        self._tasks: set[asyncio.Task] = set()
+
+    def schedule(self, key: Hashable, callback: Callable[[], Awaitable]):
+        self.cancel(key)
+        self._timers[key] = asyncio.get_running_loop().call_later(
+            self.delay, self._fire, key, callback)
+
+    def cancel(self, key: Hashable):
+        if (timer := self._timers.pop(key, None)):
+            timer.cancel()
+
+    def pending(self, key: Hashable) -> bool:
+        return key in self._timers
+
+    def _fire(self, key: Hashable, callback: Callable[[], Awaitable]):
+        del self._timers[key]
+
+        # hold a reference so the task doesn't get garbage collected
+        task = asyncio.ensure_future(callback())
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
@@ -93,17 +93,22 @@ async def exc_embed(e: Exception,
 
 def error_handler(ephemeral: bool = True):
     def _deco(f):
+        # work out where the first real argument lives once, rather than
+        # on every call
+        first_index, first_name = None, None
+        for i, param in enumerate(inspect.signature(f).parameters.values()):
+            if param.name not in ["self", "cls"]:
+                first_index, first_name = i, param.name
+                break
+
         @wraps(f)
         async def _inner(*args: Any, **kwargs):
-            sig = inspect.signature(f)
-            bound_args = sig.bind(*args, **kwargs)
-            bound_args.apply_defaults()
-
             first_arg = None
-            for param in sig.parameters.values():
-                if param.name not in ["self", "cls"]:
-                    first_arg = bound_args.arguments[param.name]
-                    break
+            if first_index is not None:
+                if first_index < len(args):
+                    first_arg = args[first_index]
+                else:
+                    first_arg = kwargs.get(first_name)
 
             inter: disnake.Interaction = None
             if isinstance(first_arg, disnake.Interaction):
@@ -0,0 +1,46 @@
+import disnake
+import time
+
+from .audit_log import AuditKey
+
+# changes we've made ourselves, and are expecting to hear back about from the
+# gateway. handlers check here before going to the audit log, so our own
+# edits get dismissed without a REST call.
+class IntentLedger:
+    def __init__(self, ttl: float = 30):
+        self.ttl = ttl
+        self._intents: dict[AuditKey, list[float]] = {}
+
+    def _sweep(self, now: float):
+        for key in list(self._intents):
+            expiries = [t for t in self._intents[key] if t > now]
+            if expiries:
+                self._intents[key] = expiries
+            else:
+                del self._intents[key]
+
+    # call this *before* making the change, since the gateway event can
+    # beat the REST response back to us
+    def expect(self, action: disnake.AuditLogAction, target_id: int):
+        now = time.monotonic()
+        if len(self._intents) > 64:
+            self._sweep(now)
+        self._intents.setdefault(
+            (action, target_id), []).append(now + self.ttl)
+
+    def consume(self, action: disnake.AuditLogAction, target_id: int) -> bool:
+        key = (action, target_id)
+        if key not in self._intents:
+            return False
+
+        now = time.monotonic()
+        expiries = [t for t in self._intents.pop(key) if t > now]
+        if not expiries:
+            return False
+
+        expiries.pop(0)
+        if expiries:
+            self._intents[key] = expiries
+        return True
+
+ledger = IntentLedger()
@@ -0,0 +1,69 @@
+import disnake
+from typing import Optional
+
+from ..filemethods import state
+
+# keeps track of which WIP roles each member holds, so checking whether
+# someone is in a WIP is a set lookup instead of a scan over member.roles.
+# entries are filled lazily from member.roles and kept fresh from
+# on_member_update, so this never has to hit the API.
+class WipMembership:
+    def __init__(self):
+        self._members: dict[int, set[int]] = {}
+        self._wip_roles: frozenset[int] = frozenset()
+        self._version: Optional[int] = None
+
+    # the set of WIP roles only changes when state does. if it did change
+    # (WIP created, archived, role reconstructed...), cached entries are
+    # thrown out
+    @property
+    def wip_roles(self) -> frozenset[int]:
+        if self._version != state().version:
+            self._version = state().version
+            wip_roles = frozenset(wip.role.id for wip in state().wips)
+            if wip_roles != self._wip_roles:
+                self._wip_roles = wip_roles
+                self._members.clear()
+        return self._wip_roles
+
+    def roles(self, member: disnake.Member) -> set[int]:
+        wip_roles = self.wip_roles
+        if (roles := self._members.get(member.id)) is not None:
+            return roles
+
+        roles = {role.id for role in member.roles if role.id in wip_roles}
+        self._members[member.id] = roles
+        return roles
+
+    def in_wip(self, member: disnake.Member, role: disnake.Role) -> bool:
+        return role.id in self.roles(member)
+
+    # for when we change roles ourselves, and can't wait on the gateway
+    # to tell us about it
+    def add(self, member: disnake.Member, role: disnake.Role):
+        if role.id in self.wip_roles and member.id in self._members:
+            self._members[member.id].add(role.id)
+
+    def discard(self, member: disnake.Member, role: disnake.Role):
+        if member.id in self._members:
+            self._members[member.id].discard(role.id)
+
+    def forget(self, member_id: int):
+        self._members.pop(member_id, None)
+
+    def on_member_update(self, before: disnake.Member, after: disnake.Member):
+        wip_roles = self.wip_roles
+        roles = self._members.get(after.id)
+        if roles is None:
+            # not cached, we'll read fresh roles when we need them
+            return
+
+        before_ids = {role.id for role in before.roles}
+        after_ids = {role.id for role in after.roles}
+        if before_ids == after_ids:
+            return
+
+        roles -= (before_ids - after_ids)
+        roles |= (after_ids - before_ids) & wip_roles
+
+membership = WipMembership()
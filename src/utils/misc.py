@@ -1,8 +1,17 @@
 import disnake
+from datetime import datetime
 from types import SimpleNamespace
 from secrets import token_hex
 from typing import Optional, TypeAlias
 
+from .audit_log import audit_log
+
+# (channel id, message id)
+MessageRef: TypeAlias = tuple[int, int]
+
+def jump_url(guild_id: int, message: MessageRef) -> str:
+    return f"https://discord.com/channels/{guild_id}/{message[0]}/{message[1]}"
+
 async def send_modal(inter: disnake.ApplicationCommandInteraction,
                      *args, ephemeral: bool = True, **kwargs):
     kwargs.setdefault("custom_id", token_hex(32))
@@ -36,8 +45,14 @@ Blamed: TypeAlias = disnake.User | disnake.Member | disnake.Object | None
 
 async def get_blame(guild: disnake.Guild,
                     action: disnake.AuditLogAction,
-                    target_id: int) -> Blamed:
+                    target_id: int,
+                    at: Optional[datetime] = None) -> Blamed:
+    # usually the gateway has already told us
+    if (entry := audit_log.get(action, target_id, at)):
+        return entry.user
+
     async for entry in guild.audit_logs(action=action, limit=10):
+        audit_log.add(entry, replace=False)
         if not entry.target:
             continue
         if entry.target.id == target_id:
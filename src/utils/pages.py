@@ -0,0 +1,84 @@
+import disnake
+from bisect import bisect_left, bisect_right
+from typing import Callable, Optional, TYPE_CHECKING
+
+from ..filemethods import state
+from . import buttons
+
+if TYPE_CHECKING:
+    from ..datatypes import Wip
+
+# a cursor is (sort key, channel id). it doesn't care about list positions,
+# so it stays valid when WIPs are created or archived underneath it.
+Cursor = tuple[int, int]
+
+def _last_active(wip: 'Wip') -> int:
+    dt = wip.update.timestamp if wip.update else wip.timestamp
+    return -int(dt.timestamp())
+
+# keys sort ascending, so the first page of each sort is the "top" one
+SORTS: dict[str, Callable[['Wip'], int]] = {
+    "newest": lambda wip: -int(wip.timestamp.timestamp()),
+    "updated": _last_active,
+    "progress": lambda wip: -wip.progress,
+}
+
+# ordered indexes over state().wips for paging through /wips view.
+# indexes are built lazily, and thrown out whenever state changes (a WIP
+# is created, archived or edited).
+class WipPages:
+    def __init__(self):
+        self._indexes: dict[str, list[Cursor]] = {}
+        self._version: Optional[int] = None
+
+    @property
+    def wips(self) -> dict[int, 'Wip']:
+        return state().wips_by_channel
+
+    def _index(self, sort: str) -> list[Cursor]:
+        if self._version != state().version:
+            self._version = state().version
+            self._indexes.clear()
+
+        if sort not in self._indexes:
+            key = SORTS[sort]
+            self._indexes[sort] = sorted(
+                (key(wip), wip.channel.id) for wip in self.wips.values())
+        return self._indexes[sort]
+
+    @staticmethod
+    def cursor(sort: str, wip: 'Wip') -> Cursor:
+        return SORTS[sort](wip), wip.channel.id
+
+    def first(self, sort: str) -> Optional['Wip']:
+        index = self._index(sort)
+        return self.wips[index[0][1]] if index else None
+
+    def last(self, sort: str) -> Optional['Wip']:
+        index = self._index(sort)
+        return self.wips[index[-1][1]] if index else None
+
+    def next(self, sort: str, cursor: Cursor) -> Optional['Wip']:
+        index = self._index(sort)
+        i = bisect_right(index, cursor)
+        return self.wips[index[i][1]] if i < len(index) else None
+
+    def prev(self, sort: str, cursor: Cursor) -> Optional['Wip']:
+        index = self._index(sort)
+        i = bisect_left(index, cursor) - 1
+        return self.wips[index[i][1]] if i >= 0 else None
+
+    def render(self, sort: str, wip: 'Wip', member: disnake.Member):
+        cursor = self.cursor(sort, wip)
+        return {
+            "embed": wip.view_embed(),
+            "components": [
+                buttons.wip_view_prev(
+                    sort, cursor, disabled=self.prev(sort, cursor) is None),
+                buttons.wip_toggle(wip, member),
+                buttons.wip_view_next(
+                    sort, cursor, disabled=self.next(sort, cursor) is None)
+            ]
+        }
+
+pages = WipPages()
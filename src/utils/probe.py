@@ -0,0 +1,50 @@
+import disnake
+
+from typing import Optional
+
+from .errors import UserError
+from .audio_cache import AudioCache
+
+# how much of a file sniff_audio needs to see
+HEADER_SIZE = 16
+
+# works out what kind of audio a file is from its first few bytes, for the
+# formats soundcloud takes. None if it's none of them
+def sniff_audio(header: bytes) -> Optional[str]:
+    if header[:4] == b"RIFF" and header[8:12] == b"WAVE":
+        return "wav"
+    if header[:4] == b"FORM" and header[8:12] in (b"AIFF", b"AIFC"):
+        return "aiff"
+    if header[:4] == b"fLaC":
+        return "flac"
+    if header[:4] == b"OggS":
+        return "ogg"
+    if header[4:8] == b"ftyp":
+        return "m4a"
+    if header[:4] == b"\x30\x26\xb2\x75":
+        return "wma"
+    if header[:3] == b"ID3":
+        return "mp3"
+
+    # bare mpeg frames: 11 sync bits, then the layer tells mp3 from aac
+    if len(header) >= 2 and header[0] == 0xff and header[1] & 0xe0 == 0xe0:
+        return "aac" if header[1] & 0x06 == 0 else "mp3"
+
+    return None
+
+# checks an attachment is something we can actually upload before anything
+# expensive happens. the size comes from discord, and the format from the
+# start of the file (which is all that gets downloaded, if it isn't cached)
+async def probe_audio(audio: AudioCache,
+                      attachment: disnake.Attachment,
+                      max_bytes: int) -> str:
+    if attachment.size > max_bytes:
+        raise UserError(
+            f"{attachment.filename} is {attachment.size / 1e6:.0f} MB, but "
+            f"the most SoundCloud will take is {max_bytes / 1e6:.0f} MB.")
+
+    kind = sniff_audio(await audio.head(attachment, HEADER_SIZE))
+    if kind is None:
+        raise UserError(
+            f"{attachment.filename} isn't in a format SoundCloud accepts.")
+    return kind
@@ -0,0 +1,74 @@
+import asyncio
+import math
+
+from typing import Awaitable, Callable, Optional
+
+# shows how a long operation is going by editing a message, without
+# spending a rest call on every step. updates are coalesced so at most one
+# edit goes out per `interval` seconds, and only the latest status is sent.
+#
+# edit gets called with the status text, and should put it on the message.
+class ProgressReporter:
+    def __init__(self, edit: Callable[[str], Awaitable], interval: float):
+        self.edit = edit
+        self.interval = interval
+
+        self.sent = 0
+        self.coalesced = 0
+
+        self._status: Optional[str] = None
+        self._last = -math.inf
+        self._task: Optional[asyncio.Task] = None
+        self._now = asyncio.Event()
+
+    # doesn't wait for anything, so it's fine to call as often as you like
+    def update(self, status: str):
+        if self._status is not None:
+            self.coalesced += 1
+        self._status = status
+
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        try:
+            while self._status is not None:
+                wait = self._last + self.interval - loop.time()
+                if wait > 0 and not self._now.is_set():
+                    try:
+                        await asyncio.wait_for(self._now.wait(), wait)
+                    except asyncio.TimeoutError:
+                        pass
+
+                # close() might have thrown it away while we slept
+                if self._status is None:
+                    break
+
+                status, self._status = self._status, None
+                self._last = loop.time()
+                self.sent += 1
+                await self.edit(status)
+
+        except Exception as e:
+            # not being able to show progress shouldn't stop the work itself
+            print(f"Couldn't show progress: {e!r}")
+        finally:
+            self._task = None
+
+    # sends the latest status right away, and waits until it's out
+    async def flush(self):
+        if self._task is None:
+            return
+        self._now.set()
+        try:
+            await self._task
+        finally:
+            self._now.clear()
+
+    # for when the status is about to be replaced with the final result:
+    # whatever hasn't been sent is dropped, and an edit that's already on
+    # its way is waited out so it can't land on top of the result
+    async def close(self):
+        self._status = None
+        await self.flush()
@@ -0,0 +1,73 @@
+from disnake.ext import commands
+
+from collections import deque
+from typing import Any, Collection
+
+# events that cogs care about but that can show up before state has loaded.
+# until the gate opens these get queued up instead of being lost (or worse,
+# crashing on an unloaded state()), and are replayed once everything's ready.
+BUFFERED_EVENTS = (
+    "message",
+    "raw_reaction_add",
+    "raw_reaction_remove",
+    "raw_message_edit",
+    "raw_message_delete",
+    "raw_bulk_message_delete",
+)
+
+class ReadinessGate:
+    def __init__(self, bot: commands.InteractionBot,
+                 categories: Collection[str], size: int = 512):
+        self.bot = bot
+        self.categories = set(categories)
+        self.is_open = False
+        self.buffer: deque[tuple[str, tuple[Any, ...]]] = deque(maxlen=size)
+        self.dropped = 0
+
+        self._listeners = {}
+        for event in BUFFERED_EVENTS:
+            self._listeners[event] = self._make_listener(event)
+            bot.add_listener(self._listeners[event], f"on_{event}")
+
+    def _make_listener(self, event: str):
+        async def _buffer(*args):
+            if self.is_open:
+                return
+
+            if not self._wanted(event, args[0]):
+                return
+
+            if len(self.buffer) == self.buffer.maxlen:
+                self.dropped += 1
+            self.buffer.append((event, args))
+        return _buffer
+
+    # wips and sketches all live in our categories, so anything from
+    # elsewhere can't matter to us once we're up. channels are cached from
+    # GUILD_CREATE, which comes before any of these
+    def _wanted(self, event: str, payload: Any) -> bool:
+        if event == "message":
+            channel = payload.channel
+        else:
+            channel = self.bot.get_channel(payload.channel_id)
+
+        category = getattr(channel, "category", None)
+        return category is not None and category.name in self.categories
+
+    # call once every listener that should see the backlog is registered.
+    # dispatch only schedules the handlers, so nothing new can sneak in
+    # between taking our listeners out and replaying.
+    def open(self):
+        if self.is_open:
+            return
+        self.is_open = True
+
+        for event, listener in self._listeners.items():
+            self.bot.remove_listener(listener, f"on_{event}")
+
+        if self.dropped:
+            print(f"Readiness gate overflowed, dropped {self.dropped} events")
+
+        while self.buffer:
+            event, args = self.buffer.popleft()
+            self.bot.dispatch(event, *args)
@@ -0,0 +1,76 @@
+import disnake
+import asyncio
+import enum
+import traceback
+
+from collections import Counter
+from typing import Awaitable, Callable
+
+from ..filemethods import state
+from .misc import get_audio_attachment
+
+class MessageKind(enum.Flag):
+    NONE = 0
+    WIP = enum.auto()
+    SKETCH = enum.auto()
+    # "wuckbot pinned a message" system messages
+    PINS_NOTICE = enum.auto()
+    # audio attachment, from someone other than us
+    AUDIO = enum.auto()
+
+MessageHandler = Callable[[disnake.Message], Awaitable[None]]
+
+# the single on_message listener. every message is classified once, and
+# only handed to handlers that asked for every kind it was tagged with.
+# anything outside of a WIP or sketch channel is dropped without looking
+# any further.
+class MessageRouter:
+    def __init__(self):
+        self.handlers: list[tuple[MessageKind, MessageHandler]] = []
+        self.stats: Counter[str] = Counter()
+
+    def register(self, kind: MessageKind, handler: MessageHandler):
+        self.handlers.append((kind, handler))
+
+    @staticmethod
+    def classify(message: disnake.Message) -> MessageKind:
+        if message.guild is None:
+            return MessageKind.NONE
+
+        channel_id = message.channel.id
+        if channel_id in state().wips_by_channel:
+            kind = MessageKind.WIP
+        elif channel_id in state().sketches_by_channel:
+            kind = MessageKind.SKETCH
+        else:
+            return MessageKind.NONE
+
+        if message.author.id == message.guild.me.id:
+            if message.type == disnake.MessageType.pins_add:
+                kind |= MessageKind.PINS_NOTICE
+        elif get_audio_attachment(message):
+            kind |= MessageKind.AUDIO
+
+        return kind
+
+    async def on_message(self, message: disnake.Message):
+        kind = self.classify(message)
+
+        handlers = [handler for wanted, handler in self.handlers
+                    if kind and wanted in kind]
+        if not handlers:
+            self.stats["dropped"] += 1
+            return
+
+        self.stats["routed"] += 1
+
+        # one handler blowing up shouldn't take the others down with it
+        results = await asyncio.gather(
+            *(handler(message) for handler in handlers),
+            return_exceptions=True)
+        for handler, result in zip(handlers, results):
+            if isinstance(result, Exception):
+                self.stats["failed"] += 1
+                print(f"{handler.__qualname__} failed on message "
+                      f"{message.jump_url}:")
+                traceback.print_exception(result)
@@ -1,7 +1,8 @@
 from .serializer import BaseSerializer, Serializer, Serializable, Registrar
 from .typed_dict import without, Without, default, Default, TypedDict
 from .json_file import JsonFile
-from .guild_element_by_name import RoleByName, CategoryByName, TextChannelByName
+from .guild_element_by_name import GuildElementByName, RoleByName, \
+    CategoryByName, TextChannelByName
 
 from .serializers.base import base_serializers
 from .serializers.discord import disnake_serializers
@@ -17,6 +18,7 @@ __all__ = [
     "Default",
     "TypedDict",
     "JsonFile",
+    "GuildElementByName",
     "RoleByName",
     "CategoryByName",
     "TextChannelByName",
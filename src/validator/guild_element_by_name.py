@@ -1,6 +1,7 @@
 import disnake
+import asyncio
 
-from typing import TypeVar, Generic
+from typing import TypeVar, Generic, ClassVar, Any
 from dataclasses import dataclass
 
 from ..utils import UserError
@@ -10,6 +11,13 @@ T = TypeVar('T')
 class GuildElementByName(Generic[T]):
     name: str
 
+    # (guild id, element list, name) -> element. shared between every
+    # instance, and cleared per guild whenever channels/roles change
+    _resolved: ClassVar[dict[tuple[int, str, str], Any]] = {}
+
+    # in-flight fetches, so a bunch of misses at once only fetch once
+    _fetches: ClassVar[dict[tuple[int, str], asyncio.Task]] = {}
+
     @property
     def ELEM_LIST(self):
         raise NotImplementedError()
@@ -18,37 +26,61 @@ class GuildElementByName(Generic[T]):
     def TARGET_NAME(self):
         raise NotImplementedError()
 
-    async def fetch(self):
-        pass
+    async def fetch(self, guild: disnake.Guild) -> list[T]:
+        raise NotImplementedError()
+
+    @classmethod
+    def invalidate(cls, guild: disnake.Guild, *elem_lists: str):
+        stale = [key for key in cls._resolved
+                 if key[0] == guild.id and key[1] in elem_lists]
+        for key in stale:
+            del cls._resolved[key]
+
+    async def _fetch(self, guild: disnake.Guild) -> list[T]:
+        key = (guild.id, self.ELEM_LIST)
+        task = self._fetches.get(key)
+        if task is None:
+            task = asyncio.create_task(self.fetch(guild))
+            task.add_done_callback(lambda _: self._fetches.pop(key, None))
+            self._fetches[key] = task
+        return await asyncio.shield(task)
 
     async def get(self, guild: disnake.Guild) -> T:
-        elems = getattr(guild, self.ELEM_LIST)
-        if (elem := disnake.utils.get(elems, name=self.name)):
-            return elem
+        key = (guild.id, self.ELEM_LIST, self.name)
 
-        await self.fetch()
+        # check the cache, in case something got renamed without us noticing
+        if (elem := self._resolved.get(key)) is not None:
+            if elem.name == self.name:
+                return elem
+            del self._resolved[key]
 
         elems = getattr(guild, self.ELEM_LIST)
-        if (elem := disnake.utils.get(elems, name=self.name)):
-            return elem
+        if not (elem := disnake.utils.get(elems, name=self.name)):
+            elem = disnake.utils.get(await self._fetch(guild), name=self.name)
+
+        if not elem:
+            raise UserError(
+                f"Couldn't find {self.TARGET_NAME} called '{self.name}'.")
 
-        raise UserError(
-            f"Couldn't find {self.TARGET_NAME} called '{self.name}'.")
+        self._resolved[key] = elem
+        return elem
 
 class CategoryByName(GuildElementByName[disnake.CategoryChannel]):
     ELEM_LIST = "categories"
     TARGET_NAME = "a channel category"
-    async def fetch(self):
-        await self.guild.fetch_channels()
+    async def fetch(self, guild: disnake.Guild):
+        return [c for c in await guild.fetch_channels()
+                if isinstance(c, disnake.CategoryChannel)]
 
 class TextChannelByName(GuildElementByName[disnake.TextChannel]):
     ELEM_LIST = "text_channels"
     TARGET_NAME = "a text channel"
-    async def fetch(self):
-        await self.guild.fetch_channels()
+    async def fetch(self, guild: disnake.Guild):
+        return [c for c in await guild.fetch_channels()
+                if isinstance(c, disnake.TextChannel)]
 
 class RoleByName(GuildElementByName[disnake.Role]):
     ELEM_LIST = "roles"
     TARGET_NAME = "a role"
-    async def fetch(self):
-        await self.guild.fetch_roles()
+    async def fetch(self, guild: disnake.Guild):
+        return await guild.fetch_roles()
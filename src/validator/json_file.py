@@ -21,7 +21,8 @@ class JsonFileMeta(TypedDictMeta):
 def _json_file_save(self, filename, backups_folder, registrar):
 
     def _make_backup(backup_count: int = 10):
-        if backup_count <= 0:
+        # nothing to back up the first time a file is saved
+        if backup_count <= 0 or not filename.exists():
             return
 
         current_backup = filename
@@ -103,10 +104,17 @@ class JsonFile(TypedDict, metaclass=JsonFileMeta):
             with open(filename, "r") as fp:
                 data_raw = json.load(fp)
 
-        instance = await registrar.deserialize(data_raw, cls)
-        if not instance:
-            raise RuntimeError(
-                f"{cls.__qualname__} couldn't be resolved from {filename}.")
+        # loading always starts over. otherwise the singleton left behind by
+        # an earlier (maybe failed) load would be handed back as-is
+        JsonFileMeta._instances.pop(cls, None)
+        try:
+            instance = await registrar.deserialize(data_raw, cls)
+            if not instance:
+                raise RuntimeError(
+                    f"{cls.__qualname__} couldn't be resolved from {filename}.")
+        except BaseException:
+            JsonFileMeta._instances.pop(cls, None)
+            raise
 
         setattr(instance, 'save',
                 _json_file_save(instance, filename, backups_folder, registrar))
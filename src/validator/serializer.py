@@ -1,5 +1,6 @@
 from typing import Type, Optional, Union, Any, TypeAlias, TypeVar, Generic
 import typing
+import types
 
 Serializable: TypeAlias = Union[str, int, float, bool, None,
                                 list['Serializable'],
@@ -8,7 +9,9 @@ Serializable: TypeAlias = Union[str, int, float, bool, None,
 
 
 def strip_optional(T: type):
-    if typing.get_origin(T) is Union and type(None) in typing.get_args(T):
+    # both Optional[X] and X | None
+    if typing.get_origin(T) in (Union, types.UnionType) \
+            and type(None) in typing.get_args(T):
         for BaseType in typing.get_args(T):
             if BaseType is not type(None):
                 return BaseType
@@ -0,0 +1,131 @@
+import tempfile
+from collections import Counter
+from contextlib import asynccontextmanager
+from types import SimpleNamespace
+from unittest import IsolatedAsyncioTestCase
+
+from src.utils.audio_cache import AudioCache
+
+class FakeContent:
+    def __init__(self, data: bytes):
+        self.data = data
+
+    async def iter_chunked(self, size: int):
+        for i in range(0, len(self.data), size):
+            yield self.data[i:i + size]
+
+    async def read(self, n: int) -> bytes:
+        chunk, self.data = self.data[:n], self.data[n:]
+        return chunk
+
+# serves attachment urls out of a dict, and counts the gets
+class FakeSession:
+    def __init__(self, files: dict[str, bytes]):
+        self.files = files
+        self.gets: Counter[str] = Counter()
+
+    @asynccontextmanager
+    async def get(self, url: str, headers: dict | None = None):
+        self.gets[url] += 1
+        yield SimpleNamespace(raise_for_status=lambda: None,
+                              content=FakeContent(self.files[url]))
+
+def attachment(attachment_id: int, url: str):
+    return SimpleNamespace(id=attachment_id, url=url)
+
+class TestAudioCache(IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.session = FakeSession({
+            "a": b"a" * 100,
+            "a again": b"a" * 100,
+            "b": b"b" * 100,
+            "c": b"c" * 100})
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def cache(self, max_bytes: int = 1000) -> AudioCache:
+        return AudioCache(self.tmp.name, self.session, max_bytes)
+
+    async def read(self, cache: AudioCache, att) -> bytes:
+        with await cache.open(att) as fp:
+            return fp.read()
+
+    async def test_hit(self):
+        cache = self.cache()
+        a = attachment(1, "a")
+        self.assertEqual(await self.read(cache, a), b"a" * 100)
+        self.assertEqual(await self.read(cache, a), b"a" * 100)
+
+        self.assertEqual(self.session.gets["a"], 1)
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+        self.assertEqual(cache.bytes_saved, 100)
+
+    async def test_same_audio_stored_once(self):
+        cache = self.cache()
+        await self.read(cache, attachment(1, "a"))
+        await self.read(cache, attachment(2, "a again"))
+
+        self.assertEqual(cache.size, 100)
+        self.assertEqual(cache.digest(attachment(1, "a")),
+                         cache.digest(attachment(2, "a again")))
+
+    async def test_lru_eviction(self):
+        cache = self.cache(max_bytes=200)
+        a, b, c = attachment(1, "a"), attachment(2, "b"), attachment(3, "c")
+        await self.read(cache, a)
+        await self.read(cache, b)
+
+        # a is now the most recently used, so b goes
+        await self.read(cache, a)
+        await self.read(cache, c)
+
+        self.assertIsNotNone(cache.digest(a))
+        self.assertIsNone(cache.digest(b))
+        self.assertEqual(cache.size, 200)
+
+        await self.read(cache, b)
+        self.assertEqual(self.session.gets["b"], 2)
+
+    async def test_shared_file_survives_eviction(self):
+        cache = self.cache(max_bytes=200)
+        await self.read(cache, attachment(1, "a"))
+        await self.read(cache, attachment(2, "b"))
+        await self.read(cache, attachment(3, "a again"))
+        await self.read(cache, attachment(4, "c"))
+
+        # attachment 1 was evicted, but 3 still points at the same audio
+        self.assertIsNone(cache.digest(attachment(1, "a")))
+        self.assertEqual(await self.read(cache, attachment(3, "a again")),
+                         b"a" * 100)
+        self.assertEqual(self.session.gets["a again"], 1)
+
+    async def test_index_survives_restart(self):
+        await self.read(self.cache(), attachment(1, "a"))
+
+        cache = self.cache()
+        self.assertEqual(await self.read(cache, attachment(1, "a")),
+                         b"a" * 100)
+        self.assertEqual(self.session.gets["a"], 1)
+
+    async def test_head(self):
+        cache = self.cache()
+        self.assertEqual(await cache.head(attachment(1, "b"), 4), b"bbbb")
+        self.assertEqual(self.session.gets["b"], 1)
+
+        await self.read(cache, attachment(1, "b"))
+        self.assertEqual(await cache.head(attachment(1, "b"), 4), b"bbbb")
+        self.assertEqual(self.session.gets["b"], 2)
+
+    async def test_missing_file_fetched_again(self):
+        cache = self.cache()
+        a = attachment(1, "a")
+        await self.read(cache, a)
+
+        cache._path(cache.digest(a)).unlink()
+        self.assertEqual(await self.read(cache, a), b"a" * 100)
+        self.assertEqual(self.session.gets["a"], 2)
+        self.assertEqual(cache.size, 100)
+        self.assertEqual(cache.hits, 0)
@@ -0,0 +1,50 @@
+from datetime import datetime, timedelta, UTC
+from types import SimpleNamespace
+from unittest import TestCase
+
+import disnake
+
+from src.utils.audit_log import AuditLogCache
+
+NOW = datetime(2024, 1, 1, tzinfo=UTC)
+DELETE = disnake.AuditLogAction.channel_delete
+
+def entry(target_id: int, seconds_ago: float, user: str = "someone"):
+    return SimpleNamespace(
+        action=DELETE,
+        target=SimpleNamespace(id=target_id),
+        user=user,
+        created_at=NOW - timedelta(seconds=seconds_ago))
+
+class TestAuditLogCache(TestCase):
+
+    def setUp(self):
+        self.cache = AuditLogCache(size=2)
+
+    def test_recent_entry(self):
+        recent = entry(1, 5)
+        self.cache.add(recent)
+        self.assertIs(self.cache.get(DELETE, 1, NOW), recent)
+        self.assertEqual(self.cache.hits, 1)
+
+    def test_stale_entry(self):
+        self.cache.add(entry(1, 3600))
+        self.assertIsNone(self.cache.get(DELETE, 1, NOW))
+        self.assertEqual(self.cache.misses, 1)
+
+        # dropped, so a fresh one from REST can take its place
+        fresh = entry(1, 1, user="other")
+        self.cache.add(fresh, replace=False)
+        self.assertIs(self.cache.get(DELETE, 1, NOW), fresh)
+
+    def test_rest_doesnt_replace(self):
+        gateway = entry(1, 1)
+        self.cache.add(gateway)
+        self.cache.add(entry(1, 2), replace=False)
+        self.assertIs(self.cache.get(DELETE, 1, NOW), gateway)
+
+    def test_eviction(self):
+        for target_id in (1, 2, 3):
+            self.cache.add(entry(target_id, 1))
+        self.assertIsNone(self.cache.get(DELETE, 1, NOW))
+        self.assertIsNotNone(self.cache.get(DELETE, 3, NOW))
@@ -0,0 +1,55 @@
+from types import SimpleNamespace
+from unittest import IsolatedAsyncioTestCase
+from unittest.mock import AsyncMock
+
+from src.utils import ComponentRouter, UserError, optional_str
+
+def click(custom_id: str):
+    return SimpleNamespace(component=SimpleNamespace(custom_id=custom_id))
+
+class TestComponentRouter(IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.router = ComponentRouter()
+        self.handler = AsyncMock()
+        self.legacy = AsyncMock()
+        self.router.register("view", self.handler, str, int)
+        self.router.register("old", self.handler, int, legacy=self.legacy)
+        self.router.register("none", self.handler, optional_str)
+
+    # skip error_handler, so errors come straight back to the test
+    async def route(self, custom_id: str):
+        inter = click(custom_id)
+        await ComponentRouter.on_button_click.__wrapped__(self.router, inter)
+        return inter
+
+    async def test_parses_args(self):
+        inter = await self.route("view|newest|42")
+        self.handler.assert_awaited_once_with(inter, "newest", 42)
+
+    async def test_optional_str(self):
+        inter = await self.route("none|None")
+        self.handler.assert_awaited_once_with(inter, None)
+
+    async def test_unknown_prefix_ignored(self):
+        await self.route("nothing|1")
+        self.handler.assert_not_awaited()
+
+    async def test_duplicate_prefix(self):
+        with self.assertRaises(ValueError):
+            self.router.register("view", self.handler)
+
+    async def test_wrong_arg_count(self):
+        with self.assertRaises(UserError):
+            await self.route("view|newest")
+        self.handler.assert_not_awaited()
+
+    async def test_unparseable_arg(self):
+        with self.assertRaises(UserError):
+            await self.route("view|newest|abc")
+        self.handler.assert_not_awaited()
+
+    async def test_legacy_handler(self):
+        inter = await self.route("old|1|2")
+        self.legacy.assert_awaited_once_with(inter, "1", "2")
+        self.handler.assert_not_awaited()
@@ -0,0 +1,48 @@
+import asyncio
+from unittest import IsolatedAsyncioTestCase
+
+from src.utils.debounce import Debouncer
+
+class TestDebouncer(IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.debouncer = Debouncer(0.05)
+        self.fired: list[str] = []
+
+    def callback(self, value: str):
+        async def _callback():
+            self.fired.append(value)
+        return _callback
+
+    async def test_fires_after_delay(self):
+        self.debouncer.schedule("a", self.callback("a"))
+        self.assertTrue(self.debouncer.pending("a"))
+        self.assertEqual(self.fired, [])
+
+        await asyncio.sleep(0.1)
+        self.assertEqual(self.fired, ["a"])
+        self.assertFalse(self.debouncer.pending("a"))
+
+    async def test_reschedule_pushes_back(self):
+        self.debouncer.schedule("a", self.callback("first"))
+        await asyncio.sleep(0.03)
+        self.debouncer.schedule("a", self.callback("second"))
+        await asyncio.sleep(0.03)
+
+        # the first timer would have gone off by now
+        self.assertEqual(self.fired, [])
+        await asyncio.sleep(0.05)
+        self.assertEqual(self.fired, ["second"])
+
+    async def test_keys_are_independent(self):
+        self.debouncer.schedule("a", self.callback("a"))
+        self.debouncer.schedule("b", self.callback("b"))
+        await asyncio.sleep(0.1)
+        self.assertEqual(sorted(self.fired), ["a", "b"])
+
+    async def test_cancel(self):
+        self.debouncer.schedule("a", self.callback("a"))
+        self.debouncer.cancel("a")
+        self.debouncer.cancel("never scheduled")
+        await asyncio.sleep(0.1)
+        self.assertEqual(self.fired, [])
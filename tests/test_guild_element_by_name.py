@@ -0,0 +1,64 @@
+import asyncio
+from types import SimpleNamespace
+from unittest import IsolatedAsyncioTestCase
+from unittest.mock import AsyncMock
+
+from src.utils import UserError
+from src.validator import GuildElementByName
+from src.validator.guild_element_by_name import RoleByName
+
+def role(role_id: int, name: str):
+    return SimpleNamespace(id=role_id, name=name)
+
+class TestGuildElementByName(IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        GuildElementByName._resolved.clear()
+        GuildElementByName._fetches.clear()
+
+        self.fetched = [role(1, "bandmate"), role(2, "view wips")]
+
+        async def fetch_roles():
+            await asyncio.sleep(0.01)
+            return self.fetched
+
+        # nothing cached, so everything has to come from a fetch
+        self.guild = SimpleNamespace(
+            id=100, roles=[], fetch_roles=AsyncMock(side_effect=fetch_roles))
+
+    async def test_concurrent_misses_fetch_once(self):
+        results = await asyncio.gather(
+            RoleByName("bandmate").get(self.guild),
+            RoleByName("view wips").get(self.guild),
+            RoleByName("bandmate").get(self.guild))
+
+        self.assertEqual([r.id for r in results], [1, 2, 1])
+        self.guild.fetch_roles.assert_awaited_once()
+
+    async def test_resolved_are_cached(self):
+        await RoleByName("bandmate").get(self.guild)
+        await RoleByName("bandmate").get(self.guild)
+        self.guild.fetch_roles.assert_awaited_once()
+
+    async def test_guild_cache_skips_fetch(self):
+        self.guild.roles = [role(3, "admin")]
+        self.assertEqual((await RoleByName("admin").get(self.guild)).id, 3)
+        self.guild.fetch_roles.assert_not_awaited()
+
+    async def test_invalidate(self):
+        await RoleByName("bandmate").get(self.guild)
+
+        GuildElementByName.invalidate(self.guild, "roles")
+        self.fetched = [role(4, "bandmate")]
+        self.assertEqual((await RoleByName("bandmate").get(self.guild)).id, 4)
+
+    async def test_renamed_element_dropped(self):
+        bandmate = await RoleByName("bandmate").get(self.guild)
+
+        bandmate.name = "ex-bandmate"
+        self.fetched = [bandmate, role(5, "bandmate")]
+        self.assertEqual((await RoleByName("bandmate").get(self.guild)).id, 5)
+
+    async def test_missing(self):
+        with self.assertRaises(UserError):
+            await RoleByName("nobody").get(self.guild)
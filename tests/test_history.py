@@ -0,0 +1,49 @@
+from datetime import datetime, UTC
+from tempfile import TemporaryDirectory
+from unittest import IsolatedAsyncioTestCase
+
+from src.datatypes import UpdateHistory, HistoryEntry
+from src.validator import Registrar, base_serializers
+
+def entry(timestamp: int, track: str | None = None) -> HistoryEntry:
+    return HistoryEntry(timestamp=datetime.fromtimestamp(timestamp, UTC),
+                        requester=1, file=(2, timestamp),
+                        announcement=(3, timestamp), track=track)
+
+def timestamps(entries: list[HistoryEntry]) -> list[int]:
+    return [int(e.timestamp.timestamp()) for e in entries]
+
+class TestUpdateHistory(IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.registrar = Registrar(*base_serializers())
+
+    async def test_reload(self):
+        with TemporaryDirectory() as root:
+            history = UpdateHistory(root, self.registrar)
+            await history.record(10, entry(100, track="https://example"))
+            await history.record(10, entry(200))
+            await history.record(11, entry(150))
+
+            # a fresh instance reads the same thing back off disk
+            history = UpdateHistory(root, self.registrar)
+            entries = await history.entries(10)
+            self.assertEqual(timestamps(entries), [100, 200])
+            self.assertEqual(entries[0].requester, 1)
+            self.assertEqual(entries[0].file, (2, 100))
+            self.assertEqual(entries[0].announcement, (3, 100))
+            self.assertEqual(entries[0].track, "https://example")
+            self.assertIsNone(entries[1].track)
+
+            latest = await history.latest(11)
+            self.assertEqual(timestamps([latest]), [150])
+            self.assertIsNone(await history.latest(12))
+
+    async def test_since(self):
+        with TemporaryDirectory() as root:
+            history = UpdateHistory(root, self.registrar)
+            for timestamp in (300, 100, 200):
+                await history.record(10, entry(timestamp))
+
+            start = datetime.fromtimestamp(200, UTC)
+            self.assertEqual(timestamps(await history.since(10, start)),
+                             [200, 300])
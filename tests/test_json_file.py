@@ -0,0 +1,71 @@
+import json
+import tempfile
+from pathlib import Path
+from unittest import IsolatedAsyncioTestCase
+from unittest.mock import patch
+
+from src.validator import base_serializers, Registrar
+from src.validator.json_file import JsonFile, JsonFileMeta
+
+class Settings(JsonFile):
+    name: str
+    count: int = 0
+
+class TestJsonFileLoad(IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = Path(self.tmp.name) / "settings.json"
+        self.backups = Path(self.tmp.name) / "backups"
+        self.registrar = Registrar(*base_serializers())
+
+    def tearDown(self):
+        JsonFileMeta._instances.pop(Settings, None)
+        self.tmp.cleanup()
+
+    def write(self, **data):
+        with self.path.open("w") as fp:
+            json.dump(data, fp)
+
+    async def load(self) -> Settings:
+        return await Settings.load(self.path, self.backups, self.registrar)
+
+    async def test_load(self):
+        self.write(name="a", count=2)
+        settings = await self.load()
+        self.assertIs(Settings(), settings)
+        self.assertEqual((settings.name, settings.count), ("a", 2))
+
+    async def test_reload_replaces_instance(self):
+        self.write(name="a")
+        first = await self.load()
+
+        self.write(name="b")
+        second = await self.load()
+        self.assertIsNot(first, second)
+        self.assertEqual(Settings().name, "b")
+
+    # what _on_ready does when setup fails partway and gets retried
+    async def test_retry_after_failed_load(self):
+        self.write(name="a")
+        with patch.object(self.registrar, "deserialize",
+                          side_effect=RuntimeError("flaky")):
+            with self.assertRaises(RuntimeError):
+                await self.load()
+        self.assertNotIn(Settings, JsonFileMeta._instances)
+
+        self.write(name="b")
+        settings = await self.load()
+        self.assertEqual(settings.name, "b")
+
+        # and the retried one is the one that gets saved
+        settings.count = 5
+        await settings.save()
+        with self.path.open() as fp:
+            self.assertEqual(json.load(fp), {"name": "b", "count": 5})
+
+    async def test_missing_required_field(self):
+        self.write(count=1)
+        with self.assertRaises(Exception):
+            await self.load()
+        self.assertNotIn(Settings, JsonFileMeta._instances)
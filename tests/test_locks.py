@@ -0,0 +1,50 @@
+import asyncio
+from unittest import IsolatedAsyncioTestCase
+
+from src.utils.locks import KeyedLock
+
+class TestKeyedLock(IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.lock = KeyedLock()
+        self.order: list[str] = []
+
+    async def hold(self, key: str, name: str):
+        async with self.lock(key):
+            self.order.append(f"{name} in")
+            await asyncio.sleep(0.01)
+            self.order.append(f"{name} out")
+
+    async def test_same_key_serializes(self):
+        await asyncio.gather(self.hold("a", "1"), self.hold("a", "2"))
+        self.assertEqual(self.order, ["1 in", "1 out", "2 in", "2 out"])
+
+    async def test_different_keys_overlap(self):
+        await asyncio.gather(self.hold("a", "1"), self.hold("b", "2"))
+        self.assertEqual(self.order, ["1 in", "2 in", "1 out", "2 out"])
+
+    async def test_locked(self):
+        async with self.lock("a"):
+            self.assertTrue(self.lock.locked("a"))
+            self.assertFalse(self.lock.locked("b"))
+        self.assertFalse(self.lock.locked("a"))
+
+    async def test_cleans_up(self):
+        await asyncio.gather(*(self.hold("a", str(i)) for i in range(3)))
+        self.assertEqual(len(self.lock), 0)
+
+    async def test_cleans_up_after_error(self):
+        with self.assertRaises(RuntimeError):
+            async with self.lock("a"):
+                raise RuntimeError()
+        self.assertEqual(len(self.lock), 0)
+
+    async def test_cleans_up_after_cancel(self):
+        holder = asyncio.create_task(self.hold("a", "1"))
+        waiter = asyncio.create_task(self.hold("a", "2"))
+        await asyncio.sleep(0)
+        waiter.cancel()
+        await holder
+        with self.assertRaises(asyncio.CancelledError):
+            await waiter
+        self.assertEqual(len(self.lock), 0)
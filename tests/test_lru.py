@@ -0,0 +1,39 @@
+from unittest import TestCase
+
+from src.utils import LRUCache
+
+class TestLRUCache(TestCase):
+
+    def test_eviction_order(self):
+        cache = LRUCache(2)
+        cache.put("a", 1)
+        cache.put("b", 2)
+
+        # touching "a" makes "b" the least recently used
+        self.assertEqual(cache.get("a"), 1)
+        cache.put("c", 3)
+
+        self.assertIn("a", cache)
+        self.assertNotIn("b", cache)
+        self.assertIn("c", cache)
+        self.assertEqual(len(cache), 2)
+
+    def test_hit_rate(self):
+        cache = LRUCache(4)
+        self.assertEqual(cache.hit_rate, 0.0)
+
+        cache.put(1, "x")
+        cache.get(1)
+        cache.get(2)
+        cache.get(1)
+
+        self.assertEqual(cache.hits, 2)
+        self.assertEqual(cache.misses, 1)
+        self.assertAlmostEqual(cache.hit_rate, 2 / 3)
+
+    def test_pop(self):
+        cache = LRUCache(4)
+        cache.put(1, "x")
+        self.assertEqual(cache.pop(1), "x")
+        self.assertIsNone(cache.pop(1))
+        self.assertIsNone(cache.get(1))
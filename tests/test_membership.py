@@ -0,0 +1,78 @@
+from types import SimpleNamespace
+from unittest import TestCase
+from unittest.mock import patch
+
+from src.utils.membership import WipMembership
+
+def role(role_id: int):
+    return SimpleNamespace(id=role_id)
+
+def member(member_id: int, *role_ids: int):
+    return SimpleNamespace(id=member_id, roles=[role(r) for r in role_ids])
+
+class TestWipMembership(TestCase):
+
+    def setUp(self):
+        self.state = SimpleNamespace(
+            version=0,
+            wips=[SimpleNamespace(role=role(10)),
+                  SimpleNamespace(role=role(11))])
+        patcher = patch("src.utils.membership.state",
+                        side_effect=lambda: self.state)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.membership = WipMembership()
+
+    def test_only_wip_roles(self):
+        self.assertEqual(self.membership.roles(member(1, 10, 99)), {10})
+
+    def test_reads_roles_once(self):
+        alice = member(1, 10)
+        self.assertTrue(self.membership.in_wip(alice, role(10)))
+
+        # cached, so member.roles isn't looked at again
+        alice.roles = []
+        self.assertTrue(self.membership.in_wip(alice, role(10)))
+
+    def test_member_update(self):
+        before = member(1, 10)
+        self.membership.roles(before)
+
+        after = member(1, 11, 99)
+        self.membership.on_member_update(before, after)
+        self.assertEqual(self.membership.roles(after), {11})
+
+    def test_update_for_uncached_member(self):
+        self.membership.on_member_update(member(1), member(1, 10))
+        self.assertEqual(self.membership.roles(member(1, 11)), {11})
+
+    def test_add_and_discard(self):
+        alice = member(1)
+        self.membership.roles(alice)
+
+        self.membership.add(alice, role(10))
+        self.membership.add(alice, role(99))
+        self.assertEqual(self.membership.roles(alice), {10})
+
+        self.membership.discard(alice, role(10))
+        self.assertEqual(self.membership.roles(alice), set())
+
+    def test_forget(self):
+        self.membership.roles(member(1, 10))
+        self.membership.forget(1)
+        self.assertEqual(self.membership.roles(member(1)), set())
+
+    def test_new_wip_clears_cache(self):
+        self.membership.roles(member(1, 12))
+
+        self.state.wips.append(SimpleNamespace(role=role(12)))
+        self.state.version += 1
+        self.assertEqual(self.membership.roles(member(1, 12)), {12})
+
+    def test_unrelated_state_change_keeps_cache(self):
+        alice = member(1, 10)
+        self.membership.roles(alice)
+
+        alice.roles = []
+        self.state.version += 1
+        self.assertEqual(self.membership.roles(alice), {10})
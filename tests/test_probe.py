@@ -0,0 +1,21 @@
+from unittest import TestCase
+
+from src.utils import sniff_audio
+
+class TestSniffAudio(TestCase):
+
+    def test_containers(self):
+        self.assertEqual(sniff_audio(b"RIFF\x00\x00\x00\x00WAVEfmt "), "wav")
+        self.assertEqual(sniff_audio(b"FORM\x00\x00\x00\x00AIFF"), "aiff")
+        self.assertEqual(sniff_audio(b"fLaC\x00\x00\x00\x22"), "flac")
+        self.assertEqual(sniff_audio(b"\x00\x00\x00\x20ftypM4A "), "m4a")
+        self.assertEqual(sniff_audio(b"ID3\x04\x00\x00"), "mp3")
+
+    def test_bare_frames(self):
+        self.assertEqual(sniff_audio(b"\xff\xfb\x90\x64"), "mp3")
+        self.assertEqual(sniff_audio(b"\xff\xf1\x50\x80"), "aac")
+
+    def test_not_audio(self):
+        self.assertIsNone(sniff_audio(b""))
+        self.assertIsNone(sniff_audio(b"\x89PNG\r\n\x1a\n"))
+        self.assertIsNone(sniff_audio(b"RIFF\x00\x00\x00\x00AVI "))
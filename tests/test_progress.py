@@ -0,0 +1,50 @@
+import asyncio
+from unittest import IsolatedAsyncioTestCase
+
+from src.utils import ProgressReporter
+
+class TestProgressReporter(IsolatedAsyncioTestCase):
+
+    async def test_coalesces_updates(self):
+        sent = []
+
+        async def edit(status):
+            sent.append(status)
+
+        progress = ProgressReporter(edit, interval=60)
+        progress.update("a")
+        await asyncio.sleep(0)
+
+        # these all land inside the interval, so only the last one is kept
+        progress.update("b")
+        progress.update("c")
+        progress.update("d")
+        await asyncio.sleep(0.01)
+        self.assertEqual(sent, ["a"])
+
+        await progress.flush()
+        self.assertEqual(sent, ["a", "d"])
+        self.assertEqual(progress.sent, 2)
+        self.assertEqual(progress.coalesced, 2)
+
+    async def test_close_waits_for_edit(self):
+        sent = []
+        release = asyncio.Event()
+
+        async def edit(status):
+            await release.wait()
+            sent.append(status)
+
+        progress = ProgressReporter(edit, interval=60)
+        progress.update("a")
+        await asyncio.sleep(0)
+        progress.update("b")
+
+        closing = asyncio.create_task(progress.close())
+        await asyncio.sleep(0)
+        self.assertFalse(closing.done())
+
+        # the edit in flight finishes, the pending one is dropped
+        release.set()
+        await closing
+        self.assertEqual(sent, ["a"])
@@ -0,0 +1,42 @@
+from types import SimpleNamespace
+from unittest import IsolatedAsyncioTestCase
+from unittest.mock import MagicMock
+
+from src.utils import ReadinessGate
+
+def channel(channel_id: int, category: str | None):
+    return SimpleNamespace(
+        id=channel_id,
+        category=SimpleNamespace(name=category) if category else None)
+
+class TestReadinessGate(IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        channels = {1: channel(1, "WIPs"), 2: channel(2, "General"),
+                    3: channel(3, None)}
+        self.bot = MagicMock()
+        self.bot.get_channel.side_effect = channels.get
+        self.gate = ReadinessGate(self.bot, ["WIPs", "Sketches"])
+        self.channels = channels
+
+    async def test_buffers_only_our_categories(self):
+        message = self.gate._listeners["message"]
+        for channel_id in self.channels:
+            await message(SimpleNamespace(channel=self.channels[channel_id]))
+
+        reaction = self.gate._listeners["raw_reaction_add"]
+        await reaction(SimpleNamespace(channel_id=1))
+        await reaction(SimpleNamespace(channel_id=2))
+        await reaction(SimpleNamespace(channel_id=99))
+
+        self.assertEqual([event for event, _ in self.gate.buffer],
+                         ["message", "raw_reaction_add"])
+
+    async def test_open_replays(self):
+        payload = SimpleNamespace(channel_id=1)
+        await self.gate._listeners["raw_message_delete"](payload)
+        self.gate.open()
+
+        self.bot.dispatch.assert_called_once_with(
+            "raw_message_delete", payload)
+        self.assertFalse(self.gate.buffer)
@@ -0,0 +1,88 @@
+import asyncio
+import json
+import tempfile
+import time
+from pathlib import Path
+from unittest import IsolatedAsyncioTestCase
+from unittest.mock import MagicMock
+
+from src.datatypes import State, Config, Tokens, Jobs
+from src.replay import Recorder, replay, read_trace
+from src.validator.json_file import JsonFileMeta
+
+FIXTURES = Path(__file__).parent / "fixtures" / "replay"
+
+class TestReplay(IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+
+        # keep the wip fresh, or the archive loop gets to it first
+        with open(FIXTURES / "state.json") as fp:
+            state = json.load(fp)
+        for wip in state["wips"]:
+            wip["timestamp"] = int(time.time())
+
+        self.state_file = Path(self.tmp.name) / "state.json"
+        with open(self.state_file, "w") as fp:
+            json.dump(state, fp)
+
+    def tearDown(self):
+        for cls in (State, Config, Tokens, Jobs):
+            JsonFileMeta._instances.pop(cls, None)
+        self.tmp.cleanup()
+
+    async def test_update_from_bell(self):
+        report = await replay(
+            read_trace(FIXTURES / "trace.jsonl"),
+            state_file=self.state_file,
+            config_file=FIXTURES / "config.json",
+            settle=5)
+
+        self.assertFalse(report.errors)
+        self.assertEqual(report.events["MESSAGE_CREATE"], 2)
+        self.assertEqual(report.events["MESSAGE_REACTION_ADD"], 2)
+
+        # both bells land within the debounce window, so only one upload
+        calls = report.soundcloud_calls
+        self.assertEqual(calls["POST api-v2.soundcloud.com/tracks"], 1)
+
+    async def test_cleans_up(self):
+        await replay(
+            read_trace(FIXTURES / "trace.jsonl"),
+            state_file=self.state_file,
+            config_file=FIXTURES / "config.json",
+            settle=0)
+
+        for cls in (State, Config, Tokens, Jobs):
+            self.assertNotIn(cls, JsonFileMeta._instances)
+
+        # no cog loops, workers or handlers left running
+        await asyncio.sleep(0)
+        leftover = [t for t in asyncio.all_tasks()
+                    if t is not asyncio.current_task() and not t.done()]
+        self.assertEqual(leftover, [])
+
+class TestRecorder(IsolatedAsyncioTestCase):
+
+    async def test_redacts_interactions(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "trace.jsonl"
+            recorder = Recorder(MagicMock(), path)
+
+            modal = {"t": "INTERACTION_CREATE", "d": {
+                "type": 5,
+                "token": "interaction-secret",
+                "data": {"custom_id": "abc", "components": [
+                    {"type": 1, "components": [
+                        {"type": 4, "custom_id": "token",
+                         "value": "2-123456-oauth-secret"}]}]}}}
+
+            await recorder.on_socket_raw_receive(json.dumps(modal))
+            await recorder.close()
+
+            text = path.read_text()
+            self.assertNotIn("interaction-secret", text)
+            self.assertNotIn("oauth-secret", text)
+            self.assertEqual(read_trace(path)[0]["d"]["data"]["custom_id"],
+                             "abc")
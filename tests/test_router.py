@@ -0,0 +1,37 @@
+from types import SimpleNamespace
+from unittest import IsolatedAsyncioTestCase
+from unittest.mock import AsyncMock, patch
+
+from src.utils.router import MessageRouter, MessageKind
+
+class TestMessageRouter(IsolatedAsyncioTestCase):
+
+    async def test_failure_doesnt_stop_others(self):
+        router = MessageRouter()
+        failing = AsyncMock(side_effect=RuntimeError("boom"))
+        failing.__qualname__ = "failing"
+        working = AsyncMock()
+        router.register(MessageKind.WIP, failing)
+        router.register(MessageKind.WIP, working)
+
+        message = SimpleNamespace(jump_url="https://discord.com/x")
+        with patch.object(MessageRouter, "classify",
+                          return_value=MessageKind.WIP), \
+                patch("traceback.print_exception"):
+            await router.on_message(message)
+
+        working.assert_awaited_once_with(message)
+        self.assertEqual(router.stats["failed"], 1)
+        self.assertEqual(router.stats["routed"], 1)
+
+    async def test_unclassified_dropped(self):
+        router = MessageRouter()
+        handler = AsyncMock()
+        router.register(MessageKind.WIP, handler)
+
+        with patch.object(MessageRouter, "classify",
+                          return_value=MessageKind.NONE):
+            await router.on_message(SimpleNamespace())
+
+        handler.assert_not_awaited()
+        self.assertEqual(router.stats["dropped"], 1)
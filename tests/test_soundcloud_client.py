@@ -0,0 +1,141 @@
+import asyncio
+import io
+from contextlib import asynccontextmanager
+from types import SimpleNamespace
+from unittest import IsolatedAsyncioTestCase
+from unittest.mock import AsyncMock, patch
+
+import aiohttp
+
+from src.soundcloud import Client
+
+def track(state: str):
+    return SimpleNamespace(s_id=1, secret_token=None, state=state,
+                           playable=(state == "finished"))
+
+class TestWaitForTranscoding(IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        self.sc = Client("token")
+        await self.sc.http.close()
+
+    async def test_already_playable(self):
+        self.sc.fetch_track = AsyncMock()
+        finished = track("finished")
+        self.assertIs(await self.sc.wait_for_transcoding(finished), finished)
+        self.sc.fetch_track.assert_not_awaited()
+
+    async def test_polls_until_finished(self):
+        finished = track("finished")
+        self.sc.fetch_track = AsyncMock(
+            side_effect=[track("processing"), finished])
+
+        result = await self.sc.wait_for_transcoding(
+            track("processing"), interval=0.01)
+        self.assertIs(result, finished)
+        self.assertEqual(self.sc.fetch_track.await_count, 2)
+
+    async def test_failed(self):
+        self.sc.fetch_track = AsyncMock(return_value=track("failed"))
+        self.assertIsNone(await self.sc.wait_for_transcoding(
+            track("processing"), interval=0.01))
+
+    async def test_timeout(self):
+        self.sc.fetch_track = AsyncMock(return_value=track("processing"))
+        self.assertIsNone(await self.sc.wait_for_transcoding(
+            track("processing"), timeout=0.05, interval=0.01,
+            max_interval=0.02))
+        self.assertGreater(self.sc.fetch_track.await_count, 1)
+
+# plays back one outcome per upload attempt: None succeeds, an exception
+# gets raised partway through sending
+class FakeUploads:
+    def __init__(self, *outcomes: Exception | None):
+        self.outcomes = list(outcomes)
+        self.attempts = 0
+        self.timeouts: list[aiohttp.ClientTimeout] = []
+
+    @asynccontextmanager
+    async def put(self, url: str, *, headers: dict, data, timeout):
+        self.attempts += 1
+        self.timeouts.append(timeout)
+        outcome = self.outcomes.pop(0)
+        async for _ in data:
+            if outcome:
+                raise outcome
+        yield SimpleNamespace(raise_for_status=lambda: None)
+
+class TestUploadAudio(IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        self.sc = Client("token")
+        await self.sc.http.close()
+
+        self.policy = AsyncMock(side_effect=lambda **_: {
+            "uid": f"uid{self.policy.await_count}",
+            "url": "https://uploads", "headers": {}})
+        self.transcoding = AsyncMock()
+        self.sc.routes = {
+            "track_upload_policy": SimpleNamespace(run=self.policy),
+            "track_transcoding": SimpleNamespace(run=self.transcoding)}
+
+        self.fp = io.BytesIO(b"x" * 200)
+        self.progress: list[tuple[int, int]] = []
+
+        # skip the backoff
+        patcher = patch("src.soundcloud.client.asyncio.sleep", AsyncMock())
+        self.sleep = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    async def upload(self, uploads: FakeUploads, **kwargs):
+        self.sc.http = uploads
+        return await self.sc.upload_audio(
+            self.fp, filename="a.mp3",
+            progress=lambda sent, total: self.progress.append((sent, total)),
+            **kwargs)
+
+    async def test_success(self):
+        uploads = FakeUploads(None)
+        self.assertEqual(await self.upload(uploads, timeout=30), "uid1")
+
+        self.assertEqual(uploads.timeouts[0].total, 30)
+        self.assertEqual(self.progress[-1], (200, 200))
+        self.transcoding.assert_awaited_once_with(uid="uid1")
+
+    async def test_retries_with_fresh_policy(self):
+        uploads = FakeUploads(aiohttp.ClientConnectionError(),
+                              asyncio.TimeoutError(), None)
+        self.assertEqual(await self.upload(uploads), "uid3")
+
+        self.assertEqual(uploads.attempts, 3)
+        self.assertEqual(self.policy.await_count, 3)
+        self.assertEqual([c.args for c in self.sleep.await_args_list],
+                         [(1,), (2,)])
+
+        # every attempt starts from the top of the file
+        self.assertEqual(self.progress[-1], (200, 200))
+        self.transcoding.assert_awaited_once_with(uid="uid3")
+
+    async def test_gives_up(self):
+        uploads = FakeUploads(*[asyncio.TimeoutError()] * 3)
+        with self.assertRaises(asyncio.TimeoutError):
+            await self.upload(uploads, retries=2)
+
+        self.assertEqual(uploads.attempts, 3)
+        self.transcoding.assert_not_awaited()
+
+    async def test_client_error_not_retried(self):
+        forbidden = aiohttp.ClientResponseError(
+            SimpleNamespace(real_url="https://uploads"), (), status=403)
+        uploads = FakeUploads(forbidden)
+        with self.assertRaises(aiohttp.ClientResponseError):
+            await self.upload(uploads)
+
+        self.assertEqual(uploads.attempts, 1)
+        self.sleep.assert_not_awaited()
+
+    async def test_server_error_retried(self):
+        unavailable = aiohttp.ClientResponseError(
+            SimpleNamespace(real_url="https://uploads"), (), status=503)
+        uploads = FakeUploads(unavailable, None)
+        self.assertEqual(await self.upload(uploads), "uid2")
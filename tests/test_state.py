@@ -0,0 +1,89 @@
+import asyncio
+from datetime import datetime, UTC
+from types import SimpleNamespace
+from unittest import IsolatedAsyncioTestCase, TestCase
+from unittest.mock import AsyncMock
+
+from src.datatypes import State
+from src.validator.json_file import JsonFileMeta
+from src.utils.pages import WipPages
+
+def fake_wip(channel_id: int, timestamp: int):
+    return SimpleNamespace(
+        channel=SimpleNamespace(id=channel_id),
+        timestamp=datetime.fromtimestamp(timestamp, UTC),
+        update=None,
+        progress=0)
+
+class TestStateTransactions(IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        JsonFileMeta._instances.pop(State, None)
+        self.wips = [fake_wip(1, 100), fake_wip(2, 200)]
+        self.state = State(wips=list(self.wips), sketches=[], links={})
+        self.state.save = AsyncMock()
+
+    def tearDown(self):
+        JsonFileMeta._instances.pop(State, None)
+
+    async def test_remove_inside_transaction(self):
+        async with self.state.transaction():
+            version = self.state.version
+            await self.state.remove_wip(self.wips[0])
+
+            # lookups and the version see it right away, saving waits
+            self.assertIsNone(self.state.wip(1))
+            self.assertGreater(self.state.version, version)
+            self.state.save.assert_not_awaited()
+
+        self.state.save.assert_awaited_once()
+        self.assertEqual(self.state.wips, [self.wips[1]])
+
+    async def test_pages_inside_transaction(self):
+        pages = WipPages()
+        self.assertIs(pages.first("newest"), self.wips[1])
+
+        async with self.state.transaction():
+            await self.state.remove_wip(self.wips[1])
+            self.assertIs(pages.first("newest"), self.wips[0])
+            self.assertIs(pages.last("newest"), self.wips[0])
+
+    async def test_other_tasks_still_save(self):
+        entered, done = asyncio.Event(), asyncio.Event()
+
+        async def batching():
+            async with self.state.transaction():
+                entered.set()
+                await done.wait()
+
+        task = asyncio.create_task(batching())
+        await entered.wait()
+
+        # not inside a transaction here, even though another task is
+        await self.state.add_wip(fake_wip(3, 300))
+        self.state.save.assert_awaited_once()
+
+        done.set()
+        await task
+
+class TestStateLookups(TestCase):
+
+    def setUp(self):
+        JsonFileMeta._instances.pop(State, None)
+
+    def tearDown(self):
+        JsonFileMeta._instances.pop(State, None)
+
+    def test_wip_by_role(self):
+        wip = fake_wip(1, 100)
+        wip.role = SimpleNamespace(id=50)
+        state = State(wips=[wip], sketches=[], links={})
+
+        self.assertIs(state.wip_by_role(50), wip)
+        self.assertIsNone(state.wip_by_role(51))
+
+        # a reconstructed role shows up once state hears about it
+        wip.role = SimpleNamespace(id=51)
+        state.version += 1
+        self.assertIs(state.wip_by_role(51), wip)
+        self.assertIsNone(state.wip_by_role(50))
@@ -0,0 +1,48 @@
+from datetime import datetime, UTC
+from types import SimpleNamespace
+from unittest import TestCase
+
+from src.datatypes import Wip, Credit
+
+def bare_wip(**fields):
+    credit = Credit.__new__(Credit)
+    credit.__dict__.update(producers=[], vocalists=[])
+    wip = Wip.__new__(Wip)
+    wip.__dict__.update(name="song", progress=50, credit=credit, track=None,
+                        update=None, timestamp=datetime.now(UTC))
+    wip.__dict__.update(fields)
+    return wip
+
+class TestWipVersion(TestCase):
+
+    def test_same_value_keeps_version(self):
+        wip = bare_wip()
+        version = wip.version
+        wip.name = "song"
+        wip.progress = 50
+        self.assertEqual(wip.version, version)
+
+    def test_new_value_changes_version(self):
+        wip = bare_wip()
+        first = wip.version
+        wip.name = "other song"
+        second = wip.version
+        self.assertNotEqual(second, first)
+        wip.progress = 60
+        self.assertNotEqual(wip.version, second)
+
+    def test_untracked_attribute_keeps_version(self):
+        wip = bare_wip()
+        version = wip.version
+        wip.scratch = 1
+        self.assertEqual(wip.version, version)
+
+    def test_credit_edited_in_place(self):
+        wip = bare_wip()
+        wip.mark_synced("pinned")
+        wip.credit.producers.append(SimpleNamespace(id=1))
+        self.assertTrue(wip.stale("pinned"))
+
+        wip.mark_synced("pinned")
+        wip.credit.producers.clear()
+        self.assertTrue(wip.stale("pinned"))